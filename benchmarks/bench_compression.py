@@ -0,0 +1,85 @@
+"""
+Bytes saved versus CPU spent by ``CompressionMiddleware`` for typical
+responses, and what pre-compressing the docs assets saves per request.
+"""
+
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.harness import setup
+
+setup()
+
+from django.conf import settings  # noqa: E402
+from django.test import Client  # noqa: E402
+
+from plms.compression import compress, precompress_file  # noqa: E402
+from users.models import User  # noqa: E402
+from users.serializers import UserSerializer  # noqa: E402
+
+
+def payloads():
+    User.objects.bulk_create(
+        User(
+            username=f"student{i}",
+            email=f"student{i}@example.com",
+            first_name="Nguyễn",
+            last_name=f"Văn {i}",
+            avatar=f"https://cdn.example.com/avatars/{i}.png",
+        )
+        for i in range(200)
+    )
+    client = Client(HTTP_HOST="localhost")
+    users = json.dumps(UserSerializer(User.objects.all(), many=True).data).encode()
+    return {
+        "OpenAPI schema (yaml)": client.get("/api/schema/").content,
+        "Swagger UI page": client.get("/api/docs/").content,
+        "200-user list (json)": users,
+        "profile (json)": json.dumps(
+            UserSerializer(User.objects.first()).data
+        ).encode(),
+    }
+
+
+def cpu_per_call(fn, number=200):
+    start = time.process_time()
+    for _ in range(number):
+        fn()
+    return (time.process_time() - start) / number
+
+
+def main():
+    print(
+        f"min size {settings.COMPRESSION_MIN_SIZE} B, brotli quality {settings.COMPRESSION_BROTLI_QUALITY}"
+    )
+    print(
+        f"{'payload':<24} {'raw':>8} {'enc':>5} {'sent':>8} {'saved':>6} {'cpu/req':>10}"
+    )
+    bodies = payloads()
+    for label, body in bodies.items():
+        if len(body) < settings.COMPRESSION_MIN_SIZE:
+            print(
+                f"{label:<24} {len(body):>8} {'-':>5} {len(body):>8} {'0%':>6}   skipped"
+            )
+            continue
+        for encoding in ("gzip", "br"):
+            sent = len(compress(body, encoding))
+            cpu = cpu_per_call(lambda: compress(body, encoding))
+            print(
+                f"{label:<24} {len(body):>8} {encoding:>5} {sent:>8}"
+                f" {1 - sent / len(body):>6.0%} {cpu * 1e6:>8.0f}us"
+            )
+
+    path = Path(tempfile.mkdtemp()) / "schema.yaml"
+    path.write_bytes(bodies["OpenAPI schema (yaml)"])
+    for variant in precompress_file(path):
+        print(
+            f"pre-compressed schema {variant.suffix:<4} {variant.stat().st_size:>8} B"
+            "  (0us per request)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Simulate a client retry storm against the signup and token endpoints and
+compare CPU time with and without ``Idempotency-Key``.
+
+Token requests are retried concurrently (duplicates in flight together);
+signups are retried back to back, as a client does after a timeout.
+"""
+
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.harness import setup
+
+setup()
+
+from django.test import Client  # noqa: E402
+
+from users.idempotency import store  # noqa: E402
+from users.models import User  # noqa: E402
+
+USERS = 4
+RETRIES = 8
+PASSWORD = "TestPass123!"
+
+
+def post(path, data, key=None):
+    headers = {"HTTP_IDEMPOTENCY_KEY": key} if key else {}
+    return Client().post(
+        path, json.dumps(data), content_type="application/json", **headers
+    )
+
+
+def cpu(fn):
+    store.clear()
+    wall, start = time.perf_counter(), time.process_time()
+    statuses = fn()
+    return time.process_time() - start, time.perf_counter() - wall, statuses
+
+
+def token_storm(use_key):
+    def run():
+        jobs = []
+        with ThreadPoolExecutor(max_workers=USERS * RETRIES) as pool:
+            for i in range(USERS):
+                key = str(uuid.uuid4()) if use_key else None
+                data = {"username": f"storm{i}", "password": PASSWORD}
+                jobs += [
+                    pool.submit(post, "/api/auth/token/", data, key)
+                    for _ in range(RETRIES)
+                ]
+        return sorted({job.result().status_code for job in jobs})
+
+    return cpu(run)
+
+
+def signup_storm(use_key):
+    tag = uuid.uuid4().hex[:8]
+
+    def run():
+        statuses = set()
+        for i in range(USERS):
+            key = str(uuid.uuid4()) if use_key else None
+            data = {
+                "username": f"new{tag}{i}",
+                "email": f"new{tag}{i}@example.com",
+                "password": PASSWORD,
+            }
+            for _ in range(RETRIES):
+                statuses.add(post("/api/auth/signup/", data, key).status_code)
+        return sorted(statuses)
+
+    return cpu(run)
+
+
+def report(label, without, with_key):
+    saved = 1 - with_key[0] / without[0]
+    print(f"{label} ({USERS} requests x {RETRIES} attempts)")
+    print(
+        f"  no key:   cpu {without[0]:6.2f}s  wall {without[1]:6.2f}s  statuses {without[2]}"
+    )
+    print(
+        f"  with key: cpu {with_key[0]:6.2f}s  wall {with_key[1]:6.2f}s  statuses {with_key[2]}"
+    )
+    print(f"  CPU saved: {saved:.0%}")
+
+
+def main():
+    for i in range(USERS):
+        User.objects.create_user(
+            f"storm{i}", email=f"storm{i}@example.com", password=PASSWORD
+        )
+    report("token retry storm", token_storm(False), token_storm(True))
+    report("signup retries", signup_storm(False), signup_storm(True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Token introspection throughput in tokens per second per core.
+
+Batches of ``BATCH`` distinct access tokens go through ``POST
+/api/auth/introspect/``. "cold" clears the cache before every batch so each
+signature is verified; "warm" repeats batches whose tokens are already cached,
+which is what the gateway sees for tokens reused within their lifetime. Tokens
+expire a second apart, as real gateway batches are issued over time. CPU
+time of this (single-threaded) process is used, so the figures are per core.
+"""
+
+import time
+from datetime import timedelta
+
+from benchmarks.harness import count_queries, setup
+
+setup()
+
+from django.core.cache import cache  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from users.authentication import JWTAuthentication  # noqa: E402
+from users.models import User  # noqa: E402
+from users.serializers import TokenObtainPairSerializer  # noqa: E402
+
+BATCH = 100
+ROUNDS = 20
+
+
+def per_core(label, fn, tokens):
+    fn()
+    start = time.process_time()
+    for _ in range(ROUNDS):
+        fn()
+    cpu = (time.process_time() - start) / (ROUNDS * tokens)
+    print(
+        f"{label:<44} {cpu * 1e6:>8.1f} us CPU/token  {1 / cpu:>10,.0f} tokens/s/core"
+    )
+    return cpu
+
+
+def main():
+    users = [
+        User.objects.create_user(f"u{i}", email=f"u{i}@example.com")
+        for i in range(BATCH)
+    ]
+    tokens = []
+    for i, user in enumerate(users):
+        access = TokenObtainPairSerializer.get_token(user).access_token
+        access.set_exp(lifetime=timedelta(hours=1) - timedelta(seconds=i))
+        tokens.append(str(access))
+    client = APIClient()
+    client.force_authenticate(User(pk=0, username="gw", is_staff=True, is_active=True))
+
+    def introspect():
+        response = client.post(
+            "/api/auth/introspect/", {"tokens": tokens}, format="json"
+        )
+        assert all(result["active"] for result in response.json()["results"])
+
+    def cold():
+        cache.clear()
+        introspect()
+
+    authentication = JWTAuthentication()
+
+    def one_by_one():
+        # What the gateway could do today: full per-token validation in PLMS.
+        for token in tokens:
+            validated = authentication.get_validated_token(token.encode())
+            authentication.get_user(validated)
+
+    print(f"queries per warm batch of {BATCH}: {count_queries(introspect)}")
+    per_core("JWTAuthentication, one token at a time", one_by_one, BATCH)
+    slow = per_core(f"introspect, cold cache (batch {BATCH})", cold, BATCH)
+    fast = per_core(f"introspect, warm cache (batch {BATCH})", introspect, BATCH)
+    print(f"warm vs cold: {slow / fast:,.1f}x")
+
+
+if __name__ == "__main__":
+    main()
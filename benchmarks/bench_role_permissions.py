@@ -0,0 +1,50 @@
+"""
+Compare role bitset checks with Django's ``has_perm`` for a per-request user.
+
+``has_perm`` caches permissions on the user instance, so the cache is cleared
+before every call to model a fresh ``request.user``.
+"""
+
+from benchmarks.harness import bench, count_queries, setup
+
+setup()
+
+from django.contrib.auth.models import Group, Permission  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from users.models import User  # noqa: E402
+from users.permissions import role_permission  # noqa: E402
+
+CACHE_ATTRS = ("_perm_cache", "_user_perm_cache", "_group_perm_cache")
+
+
+def main():
+    teachers = Group.objects.create(name="teachers")
+    teachers.permissions.set(Permission.objects.filter(codename__endswith="_user"))
+    user = User.objects.create_user("bench", email="bench@example.com", role="teacher")
+    user.groups.add(teachers)
+
+    def django_has_perm():
+        for attr in CACHE_ATTRS:
+            user.__dict__.pop(attr, None)
+        return user.has_perm("users.change_user")
+
+    request = APIRequestFactory().get("/")
+    request.user = user
+    permission = role_permission("courses.edit", "grades.edit")()
+
+    def role_bitset():
+        return permission.has_permission(request, None)
+
+    assert django_has_perm() and role_bitset()
+    print(
+        f"queries per check: has_perm={count_queries(django_has_perm)}"
+        f" bitset={count_queries(role_bitset)}"
+    )
+    slow = bench("User.has_perm (fresh request user)", django_has_perm, 2000)
+    fast = bench("role_permission bitset", role_bitset, 200000)
+    print(f"speedup: {slow / fast:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Measure HTTP throughput of ``manage.py serve`` against ``runserver``.
+
+Each server is started as a subprocess on a free port and hit with keep-alive
+clients for a fixed duration. Only ``/api/auth/ping/`` is used, so the numbers
+show server overhead rather than database cost.
+
+    python -m benchmarks.bench_server [--duration 10] [--concurrency 8]
+"""
+
+import argparse
+import http.client
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+PATH = "/api/auth/ping/"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", PATH)
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def hammer(port, concurrency, duration):
+    latencies, errors = [], [0]
+    stop = time.monotonic() + duration
+    lock = threading.Lock()
+
+    def client():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        local = []
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            try:
+                conn.request("GET", PATH)
+                response = conn.getresponse()
+                response.read()
+                if response.will_close:
+                    conn.close()
+            except OSError:
+                conn.close()
+                with lock:
+                    errors[0] += 1
+                continue
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    return {
+        "rps": len(latencies) / duration,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99)] * 1000,
+        "errors": errors[0],
+    }
+
+
+def run_server(label, args, concurrency, duration):
+    port = free_port()
+    proc = subprocess.Popen(
+        (
+            [sys.executable, "manage.py", *args, f"127.0.0.1:{port}"]
+            if args[0] == "runserver"
+            else [sys.executable, "manage.py", *args, "--bind", f"127.0.0.1:{port}"]
+        ),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_up(port)
+        hammer(port, concurrency, 1)  # warm every worker
+        result = hammer(port, concurrency, duration)
+    finally:
+        proc.terminate()
+        proc.wait()
+    print(
+        f"{label:<34} {result['rps']:>8,.0f} req/s  p50 {result['p50']:6.2f} ms"
+        f"  p99 {result['p99']:6.2f} ms  errors {result['errors']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    options = parser.parse_args()
+
+    print(
+        f"GET {PATH}, {options.concurrency} keep-alive clients, {options.duration:g}s"
+    )
+    run_server(
+        "runserver --noreload",
+        ["runserver", "--noreload"],
+        options.concurrency,
+        options.duration,
+    )
+    run_server(
+        "serve (sync, defaults)", ["serve"], options.concurrency, options.duration
+    )
+    run_server(
+        "serve --threads 4",
+        ["serve", "--threads", "4"],
+        options.concurrency,
+        options.duration,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Shared helpers for the scripts in ``benchmarks/``.
+
+Each script calls ``setup()`` to configure Django against a throwaway test
+database, then times callables with ``bench()``. Run them from the project
+root, e.g. ``python -m benchmarks.bench_role_permissions``.
+"""
+
+import logging
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import django
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "plms.settings")
+    django.setup()
+    # Expected 4xx responses would otherwise be logged once per request.
+    logging.getLogger("django.request").setLevel(logging.ERROR)
+
+    from django.conf import settings
+    from django.test.utils import setup_databases, setup_test_environment
+
+    # Keep enqueued jobs and cached values out of the real SQLite files.
+    tmp = Path(tempfile.mkdtemp())
+    settings.JOBS_DATABASE = tmp / "jobs.sqlite3"
+    settings.CACHES["default"]["LOCATION"] = str(tmp / "cache.sqlite3")
+    setup_test_environment()
+    setup_databases(verbosity=0, interactive=False)
+
+
+def bench(label, fn, number=10000, repeat=5):
+    """Time ``fn`` ``number`` times per round and print the best round."""
+    fn()
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - start) / number)
+    best = min(rounds)
+    print(
+        f"{label:<40} {best * 1e6:>10.2f} us/op  {1 / best:>12,.0f} ops/s"
+        f"  (median {statistics.median(rounds) * 1e6:.2f} us)"
+    )
+    return best
+
+
+def count_queries(fn):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as ctx:
+        fn()
+    return len(ctx.captured_queries)
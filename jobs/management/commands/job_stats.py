@@ -0,0 +1,17 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from jobs import queue
+
+
+class Command(BaseCommand):
+    help = "Print job queue depth and latency metrics as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--window", type=int, default=3600, help="Latency window in seconds."
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(json.dumps(queue.metrics(options["window"]), indent=2))
@@ -0,0 +1,70 @@
+import logging
+import signal
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs import queue
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Run background job worker threads until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=settings.JOBS_WORKER_THREADS)
+        parser.add_argument("--batch", type=int, default=settings.JOBS_BATCH_SIZE)
+        parser.add_argument("--poll", type=float, default=settings.JOBS_POLL_INTERVAL)
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+
+        workers = [
+            threading.Thread(
+                target=self.work,
+                args=(stop, options["batch"], options["poll"]),
+                name=f"jobs-{index}",
+            )
+            for index in range(options["threads"])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f"Started {len(workers)} job workers.")
+
+        last_report = time.monotonic()
+        while not stop.wait(1.0):
+            if time.monotonic() - last_report >= settings.JOBS_METRICS_INTERVAL:
+                last_report = time.monotonic()
+                queue.purge(settings.JOBS_RETENTION_SECONDS)
+                logger.info("jobs metrics %s", queue.metrics())
+
+        for worker in workers:
+            worker.join()
+        self.stdout.write("Job workers stopped.")
+
+    def work(self, stop, batch, poll):
+        while not stop.is_set():
+            rows = queue.claim(batch)
+            if not rows:
+                stop.wait(poll)
+                continue
+            for row in rows:
+                close_old_connections()
+                started = time.monotonic()
+                ok = queue.run(row)
+                logger.log(
+                    logging.INFO if ok else logging.WARNING,
+                    "job %s %s (attempt %s) %s in %.3fs",
+                    row["id"],
+                    row["name"],
+                    row["attempts"],
+                    "done" if ok else "failed",
+                    time.monotonic() - started,
+                )
+        close_old_connections()
@@ -0,0 +1,227 @@
+"""
+Durable job queue stored in a local SQLite file (``settings.JOBS_DATABASE``).
+
+Jobs are registered with ``@job`` and enqueued with ``func.delay(...)``. The
+``run_jobs`` management command starts worker threads that claim jobs in
+batches, retry failures with exponential backoff and mark them done.
+"""
+
+import json
+import random
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    idempotency_key TEXT UNIQUE,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_at REAL NOT NULL,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    locked_until REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, run_at);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+"""
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+REGISTRY = {}
+
+_local = threading.local()
+
+
+def connect():
+    """Return this thread's connection, reopening it if the path changed."""
+    path = str(settings.JOBS_DATABASE)
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != path:
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        _local.conn, _local.path = conn, path
+    return conn
+
+
+def job(name=None, max_attempts=None):
+    """Register a function as a job and give it a ``delay()`` helper."""
+
+    def decorator(func):
+        job_name = name or f"{func.__module__}.{func.__name__}"
+        attempts = max_attempts or settings.JOBS_MAX_ATTEMPTS
+
+        def delay(*args, idempotency_key=None, **kwargs):
+            return enqueue(
+                job_name,
+                args,
+                kwargs,
+                idempotency_key=idempotency_key,
+                max_attempts=attempts,
+            )
+
+        REGISTRY[job_name] = func
+        func.job_name = job_name
+        func.delay = delay
+        return func
+
+    return decorator
+
+
+def enqueue(name, args=(), kwargs=None, idempotency_key=None, max_attempts=None):
+    """
+    Insert a job and return its id. Returns ``None`` if ``idempotency_key`` was
+    already used, or inside a transaction, where the insert waits for commit.
+    """
+    now = time.time()
+    row = (
+        name,
+        json.dumps({"args": list(args), "kwargs": kwargs or {}}),
+        idempotency_key,
+        max_attempts or settings.JOBS_MAX_ATTEMPTS,
+        now,
+        now,
+    )
+    result = {}
+
+    def insert():
+        cursor = connect().execute(
+            "INSERT INTO jobs (name, payload, idempotency_key, max_attempts,"
+            " run_at, enqueued_at) VALUES (?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (idempotency_key) DO NOTHING",
+            row,
+        )
+        result["id"] = cursor.lastrowid if cursor.rowcount else None
+
+    transaction.on_commit(insert)
+    return result.get("id")
+
+
+def claim(limit):
+    """Claim up to ``limit`` due jobs, including ones whose worker died."""
+    now = time.time()
+    conn = connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows = conn.execute(
+            "SELECT * FROM jobs WHERE (state = ? AND run_at <= ?)"
+            " OR (state = ? AND locked_until < ?) ORDER BY run_at, id LIMIT ?",
+            (QUEUED, now, RUNNING, now, limit),
+        ).fetchall()
+        conn.executemany(
+            "UPDATE jobs SET state = ?, attempts = attempts + 1, started_at = ?,"
+            " locked_until = ? WHERE id = ?",
+            [(RUNNING, now, now + settings.JOBS_LEASE_SECONDS, r["id"]) for r in rows],
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return [{**dict(r), "attempts": r["attempts"] + 1} for r in rows]
+
+
+def backoff(attempts):
+    delay = settings.JOBS_BACKOFF_BASE * 2 ** (attempts - 1)
+    delay = min(delay, settings.JOBS_BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def complete(job_id):
+    connect().execute(
+        "UPDATE jobs SET state = ?, finished_at = ?, locked_until = NULL"
+        " WHERE id = ?",
+        (DONE, time.time(), job_id),
+    )
+
+
+def fail(row, error):
+    now = time.time()
+    if row["attempts"] >= row["max_attempts"]:
+        state, run_at, finished_at = FAILED, row["run_at"], now
+    else:
+        state, run_at, finished_at = QUEUED, now + backoff(row["attempts"]), None
+    connect().execute(
+        "UPDATE jobs SET state = ?, run_at = ?, finished_at = ?,"
+        " locked_until = NULL, last_error = ? WHERE id = ?",
+        (state, run_at, finished_at, error, row["id"]),
+    )
+
+
+def run(row):
+    """Execute one claimed job and record the outcome. Returns ``True`` on success."""
+    try:
+        func = REGISTRY[row["name"]]
+        payload = json.loads(row["payload"])
+        func(*payload["args"], **payload["kwargs"])
+    except Exception as exc:
+        fail(row, f"{type(exc).__name__}: {exc}")
+        return False
+    complete(row["id"])
+    return True
+
+
+def run_pending(limit=None):
+    """Run due jobs in the current thread until none are left; used by tests."""
+    processed = 0
+    while True:
+        rows = claim(limit or settings.JOBS_BATCH_SIZE)
+        if not rows:
+            return processed
+        for row in rows:
+            run(row)
+            processed += 1
+
+
+def purge(older_than):
+    cursor = connect().execute(
+        "DELETE FROM jobs WHERE state = ? AND finished_at < ?",
+        (DONE, time.time() - older_than),
+    )
+    return cursor.rowcount
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def metrics(window=3600):
+    """Queue depth by state and wait/run latency percentiles over ``window`` seconds."""
+    conn = connect()
+    depth = {state: 0 for state in (QUEUED, RUNNING, DONE, FAILED)}
+    depth.update(
+        conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+    )
+    rows = conn.execute(
+        "SELECT started_at - enqueued_at, finished_at - started_at FROM jobs"
+        " WHERE state = ? AND finished_at >= ?",
+        (DONE, time.time() - window),
+    ).fetchall()
+    waits = [r[0] for r in rows]
+    runs = [r[1] for r in rows]
+    oldest = conn.execute(
+        "SELECT MIN(enqueued_at) FROM jobs WHERE state = ?", (QUEUED,)
+    ).fetchone()[0]
+    return {
+        "depth": depth,
+        "oldest_queued_age": time.time() - oldest if oldest else 0.0,
+        "completed": len(rows),
+        "wait_p50": _percentile(waits, 0.5),
+        "wait_p95": _percentile(waits, 0.95),
+        "run_p50": _percentile(runs, 0.5),
+        "run_p95": _percentile(runs, 0.95),
+    }
@@ -0,0 +1,64 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+
+from . import queue
+
+calls = []
+
+
+@queue.job(name="tests.record")
+def record(value):
+    calls.append(value)
+
+
+@queue.job(name="tests.flaky", max_attempts=2)
+def flaky():
+    raise RuntimeError("boom")
+
+
+class JobQueueTests(TransactionTestCase):
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        override = override_settings(
+            JOBS_DATABASE=Path(tmp) / "jobs.sqlite3", JOBS_BACKOFF_BASE=0
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        calls.clear()
+
+    def test_jobs_run_once_per_idempotency_key(self):
+        self.assertIsNotNone(record.delay(1, idempotency_key="k"))
+        self.assertIsNone(record.delay(1, idempotency_key="k"))
+        record.delay(2)
+        self.assertEqual(queue.metrics()["depth"]["queued"], 2)
+
+        self.assertEqual(queue.run_pending(), 2)
+        self.assertEqual(calls, [1, 2])
+        stats = queue.metrics()
+        self.assertEqual(stats["depth"]["done"], 2)
+        self.assertEqual(stats["completed"], 2)
+
+    def test_failures_retry_then_give_up(self):
+        flaky.delay()
+        self.assertEqual(queue.run_pending(), 2)
+        row = queue.connect().execute("SELECT * FROM jobs").fetchone()
+        self.assertEqual(row["state"], queue.FAILED)
+        self.assertEqual(row["attempts"], 2)
+        self.assertIn("boom", row["last_error"])
+
+    def test_enqueue_waits_for_commit(self):
+        with transaction.atomic():
+            self.assertIsNone(record.delay(3))
+            self.assertEqual(queue.metrics()["depth"]["queued"], 0)
+        self.assertEqual(queue.metrics()["depth"]["queued"], 1)
+
+    def test_expired_lease_is_reclaimed(self):
+        record.delay(4)
+        with self.settings(JOBS_LEASE_SECONDS=-1):
+            self.assertEqual(len(queue.claim(10)), 1)
+        self.assertEqual(len(queue.claim(10)), 1)
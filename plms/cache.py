@@ -0,0 +1,348 @@
+"""
+Two-tier cache backend that needs no external service.
+
+- L1 is a small per-process LRU. Entries live at most ``L1_TIMEOUT`` seconds so
+  a write or delete made by another worker is seen within that window.
+- L2 is a SQLite file (``LOCATION``) in WAL mode shared by every worker on the
+  node, so data survives restarts and is computed once per node.
+
+Keys are ``<KEY_PREFIX>:<version>:<EPOCH>:<key>``; bump ``EPOCH`` to drop
+everything cached by an older deploy. ``get_or_set`` guards against stampedes
+with a cross-process lock in L2 plus probabilistic early refresh, and
+``stats()`` reports hits and misses per namespace (the part of the key before
+the first ``:``).
+"""
+
+import math
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL
+);
+CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires);
+CREATE TABLE IF NOT EXISTS locks (
+    key TEXT PRIMARY KEY,
+    expires REAL NOT NULL
+);
+"""
+
+_missing = object()
+
+
+def namespace_of(key):
+    return key.split(":", 1)[0] if ":" in key else "default"
+
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._path = str(location)
+        self._l1_max_entries = int(options.get("L1_MAX_ENTRIES", 1024))
+        self._l1_timeout = float(options.get("L1_TIMEOUT", 5))
+        self._epoch = str(options.get("EPOCH", "1"))
+        self._lock_timeout = float(options.get("LOCK_TIMEOUT", 10))
+        self._beta = float(options.get("EARLY_REFRESH_BETA", 1.0))
+        self._l1 = OrderedDict()
+        self._l1_lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = defaultdict(Counter)
+        self._sets = 0
+
+    # -- plumbing -----------------------------------------------------------
+
+    def make_key(self, key, version=None):
+        return super().make_key(f"{self._epoch}:{key}", version)
+
+    def _db(self):
+        conn = getattr(self._local, "conn", None)
+        # SQLite connections must not be shared with forked server workers.
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self._path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _expiry(self, timeout):
+        return self.get_backend_timeout(timeout)
+
+    def _l1_get(self, key, now):
+        with self._l1_lock:
+            entry = self._l1.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._l1[key]
+                return None
+            self._l1.move_to_end(key)
+            return entry[1:]
+
+    def _l1_set(self, key, expires, blob, now):
+        l1_expires = now + self._l1_timeout
+        if expires is not None:
+            l1_expires = min(l1_expires, expires)
+        with self._l1_lock:
+            self._l1[key] = (l1_expires, expires, blob)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self._l1_max_entries:
+                self._l1.popitem(last=False)
+
+    def _l1_delete(self, keys):
+        with self._l1_lock:
+            for key in keys:
+                self._l1.pop(key, None)
+
+    def _load(self, key, namespace):
+        """
+        Return ``(expires, delta, value)`` for ``key`` or ``None``. Hits and
+        misses are counted against ``namespace`` unless it is ``None``.
+        """
+        now = time.time()
+        hit = self._l1_get(key, now)
+        if hit is not None:
+            tier = "l1_hits"
+        else:
+            row = (
+                self._db()
+                .execute(
+                    "SELECT expires, value FROM cache WHERE key = ?"
+                    " AND (expires IS NULL OR expires > ?)",
+                    (key, now),
+                )
+                .fetchone()
+            )
+            if row is None:
+                if namespace is not None:
+                    self._stats[namespace]["misses"] += 1
+                return None
+            hit, tier = row, "l2_hits"
+            self._l1_set(key, row[0], row[1], now)
+        if namespace is not None:
+            self._stats[namespace][tier] += 1
+        expires, blob = hit
+        delta, value = pickle.loads(blob)
+        return expires, delta, value
+
+    def _store(self, key, value, timeout, delta=0.0):
+        now = time.time()
+        expires = self._expiry(timeout)
+        blob = pickle.dumps((delta, value), pickle.HIGHEST_PROTOCOL)
+        self._db().execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+            (key, blob, expires),
+        )
+        self._l1_set(key, expires, blob, now)
+        self._maybe_cull()
+
+    def _maybe_cull(self):
+        self._sets += 1
+        if self._sets % 100:
+            return
+        db = self._db()
+        db.execute("DELETE FROM cache WHERE expires <= ?", (time.time(),))
+        db.execute("DELETE FROM locks WHERE expires <= ?", (time.time(),))
+        count = db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        if count > self._max_entries:
+            db.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache"
+                " ORDER BY expires IS NULL, expires LIMIT ?)",
+                (count // self._cull_frequency,),
+            )
+
+    # -- Django cache API ---------------------------------------------------
+
+    def get(self, key, default=None, version=None):
+        entry = self._load(self.make_and_validate_key(key, version), namespace_of(key))
+        return default if entry is None else entry[2]
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._stats[namespace_of(key)]["sets"] += 1
+        self._store(self.make_and_validate_key(key, version), value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        full_key = self.make_and_validate_key(key, version)
+        now = time.time()
+        expires = self._expiry(timeout)
+        blob = pickle.dumps((0.0, value), pickle.HIGHEST_PROTOCOL)
+        db = self._db()
+        db.execute("DELETE FROM cache WHERE key = ? AND expires <= ?", (full_key, now))
+        added = db.execute(
+            "INSERT OR IGNORE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+            (full_key, blob, expires),
+        ).rowcount
+        if added:
+            self._l1_set(full_key, expires, blob, now)
+        return bool(added)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        full_key = self.make_and_validate_key(key, version)
+        self._l1_delete([full_key])
+        return bool(
+            self._db()
+            .execute(
+                "UPDATE cache SET expires = ? WHERE key = ?"
+                " AND (expires IS NULL OR expires > ?)",
+                (self._expiry(timeout), full_key, time.time()),
+            )
+            .rowcount
+        )
+
+    def delete(self, key, version=None):
+        full_key = self.make_and_validate_key(key, version)
+        self._l1_delete([full_key])
+        return bool(
+            self._db().execute("DELETE FROM cache WHERE key = ?", (full_key,)).rowcount
+        )
+
+    def has_key(self, key, version=None):
+        return self.get(key, _missing, version) is not _missing
+
+    def clear(self):
+        with self._l1_lock:
+            self._l1.clear()
+        self._db().execute("DELETE FROM cache")
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        full_keys = {self.make_and_validate_key(key, version): key for key in keys}
+        now = time.time()
+        found, remaining = {}, []
+        for full_key, key in full_keys.items():
+            hit = self._l1_get(full_key, now)
+            if hit is None:
+                remaining.append(full_key)
+            else:
+                found[key] = pickle.loads(hit[1])[1]
+                self._stats[namespace_of(key)]["l1_hits"] += 1
+        for start in range(0, len(remaining), 500):
+            chunk = remaining[start : start + 500]
+            rows = self._db().execute(
+                f"SELECT key, expires, value FROM cache WHERE key IN"
+                f" ({','.join('?' * len(chunk))}) AND (expires IS NULL OR expires > ?)",
+                (*chunk, now),
+            )
+            for full_key, expires, blob in rows:
+                key = full_keys[full_key]
+                found[key] = pickle.loads(blob)[1]
+                self._stats[namespace_of(key)]["l2_hits"] += 1
+                self._l1_set(full_key, expires, blob, now)
+        for key in keys:
+            if key not in found:
+                self._stats[namespace_of(key)]["misses"] += 1
+        return found
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        if not data:
+            return []
+        now = time.time()
+        expires = self._expiry(timeout)
+        rows = []
+        for key, value in data.items():
+            full_key = self.make_and_validate_key(key, version)
+            blob = pickle.dumps((0.0, value), pickle.HIGHEST_PROTOCOL)
+            rows.append((full_key, blob, expires))
+            self._l1_set(full_key, expires, blob, now)
+            self._stats[namespace_of(key)]["sets"] += 1
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                rows,
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        self._maybe_cull()
+        return []
+
+    def delete_many(self, keys, version=None):
+        full_keys = [self.make_and_validate_key(key, version) for key in keys]
+        if not full_keys:
+            return
+        self._l1_delete(full_keys)
+        db = self._db()
+        for start in range(0, len(full_keys), 500):
+            chunk = full_keys[start : start + 500]
+            db.execute(
+                f"DELETE FROM cache WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            )
+
+    def close(self, **kwargs):
+        # Connections are per thread and reused across requests.
+        pass
+
+    # -- stampede protection -----------------------------------------------
+
+    def _acquire(self, key):
+        now = time.time()
+        db = self._db()
+        db.execute("DELETE FROM locks WHERE key = ? AND expires <= ?", (key, now))
+        return bool(
+            db.execute(
+                "INSERT OR IGNORE INTO locks (key, expires) VALUES (?, ?)",
+                (key, now + self._lock_timeout),
+            ).rowcount
+        )
+
+    def _release(self, key):
+        self._db().execute("DELETE FROM locks WHERE key = ?", (key,))
+
+    def _refresh_early(self, expires, delta):
+        # XFetch: recompute a little before expiry, more eagerly for values
+        # that are slow to compute.
+        if expires is None or not delta:
+            return False
+        return time.time() - delta * self._beta * math.log(random.random()) >= expires
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        full_key = self.make_and_validate_key(key, version)
+        namespace = namespace_of(key)
+        entry = self._load(full_key, namespace)
+        if entry is not None and not self._refresh_early(entry[0], entry[1]):
+            return entry[2]
+
+        lock_key = f"lock:{full_key}"
+        acquired = self._acquire(lock_key)
+        if not acquired:
+            if entry is not None:
+                # Someone else is already refreshing; the value is still valid.
+                return entry[2]
+            self._stats[namespace]["lock_waits"] += 1
+            deadline = time.monotonic() + self._lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(0.02)
+                self._l1_delete([full_key])
+                entry = self._load(full_key, None)
+                if entry is not None:
+                    return entry[2]
+        elif entry is not None:
+            self._stats[namespace]["early_refreshes"] += 1
+
+        try:
+            started = time.monotonic()
+            value = default() if callable(default) else default
+            if value is not None:
+                self._store(full_key, value, timeout, time.monotonic() - started)
+        finally:
+            if acquired:
+                self._release(lock_key)
+        return value
+
+    def stats(self):
+        """Per-namespace counters for this process."""
+        return {namespace: dict(counts) for namespace, counts in self._stats.items()}
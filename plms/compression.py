@@ -0,0 +1,152 @@
+"""
+Content-encoding helpers shared by ``CompressionMiddleware``, the
+pre-compressed file views and ``manage.py compress_assets``.
+
+Brotli is used when the optional ``brotli`` package is installed; gzip always
+works and reuses Django's BREACH-padded helpers. Brotli output is not padded,
+so HTML responses only ever get gzip.
+"""
+
+import gzip
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Preferred first when the client rates several encodings equally.
+STATIC_ENCODINGS = ("br", "gzip")
+ENCODINGS = STATIC_ENCODINGS if brotli else ("gzip",)
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# Types that are already compressed or gain nothing from it.
+INCOMPRESSIBLE_PREFIXES = ("image/", "video/", "audio/", "font/woff")
+INCOMPRESSIBLE_TYPES = {
+    "application/gzip",
+    "application/zip",
+    "application/x-7z-compressed",
+    "application/x-brotli",
+    "application/pdf",
+    "application/octet-stream",
+}
+
+
+def parse_accept_encoding(header):
+    """Return ``{coding: q}`` for an ``Accept-Encoding`` header."""
+    codings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[name] = q
+    return codings
+
+
+def choose_encoding(header, available=ENCODINGS):
+    """Pick the best of ``available`` for the client, or ``None`` for identity."""
+    codings = parse_accept_encoding(header or "")
+    wildcard = codings.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = codings.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def is_compressible(content_type):
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type == "image/svg+xml":
+        return True
+    if media_type in INCOMPRESSIBLE_TYPES:
+        return False
+    return not media_type.startswith(INCOMPRESSIBLE_PREFIXES)
+
+
+def encodings_for(content_type):
+    """
+    Encodings the middleware may use for ``content_type``. Only gzip output
+    gets BREACH padding, so HTML (which reflects input such as ``?q=`` next
+    to CSRF tokens) is never sent as ``br``.
+    """
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return ("gzip",) if media_type == "text/html" else ENCODINGS
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return compress_string(data, max_random_bytes=settings.COMPRESSION_RANDOM_BYTES)
+
+
+def compress_stream(chunks, encoding):
+    if encoding == "gzip":
+        yield from compress_sequence(
+            chunks, max_random_bytes=settings.COMPRESSION_RANDOM_BYTES
+        )
+        return
+    compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+    for chunk in chunks:
+        # Flush per chunk so streamed responses keep flowing to the client.
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def compress_async_stream(chunks, encoding):
+    # Like GZipMiddleware, async gzip emits one gzip member per chunk.
+    compressor = (
+        brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        if encoding == "br"
+        else None
+    )
+    async for chunk in chunks:
+        if compressor is None:
+            yield compress_string(
+                chunk, max_random_bytes=settings.COMPRESSION_RANDOM_BYTES
+            )
+        else:
+            yield compressor.process(chunk) + compressor.flush()
+    if compressor is not None:
+        yield compressor.finish()
+
+
+def precompress_file(path, min_size=None):
+    """
+    Write ``.gz`` (and ``.br`` when available) siblings of ``path`` at maximum
+    compression. Variants that don't shrink the file are removed.
+    Returns the list of variant paths written.
+    """
+    path = Path(path)
+    data = path.read_bytes()
+    if len(data) < (
+        min_size if min_size is not None else settings.COMPRESSION_MIN_SIZE
+    ):
+        return []
+    written = []
+    variants = {"gzip": lambda d: gzip.compress(d, compresslevel=9, mtime=0)}
+    if brotli:
+        variants["br"] = lambda d: brotli.compress(d, quality=11)
+    for encoding, func in variants.items():
+        target = path.with_name(path.name + SUFFIXES[encoding])
+        compressed = func(data)
+        if len(compressed) < len(data):
+            target.write_bytes(compressed)
+            written.append(target)
+        elif target.exists():
+            target.unlink()
+    return written
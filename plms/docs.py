@@ -0,0 +1,62 @@
+"""
+The prebuilt OpenAPI document served by ``plms.views.schema_view``.
+
+``manage.py compress_assets`` writes ``schema.yaml`` and ``schema.json`` next
+to a stamp of the code they were generated from. The file is only served while that stamp matches
+the running code, and ``manage.py serve`` rebuilds it at startup when it
+doesn't, so the docs can't drift behind the API.
+"""
+
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+import drf_spectacular
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+
+from .compression import precompress_file
+
+# Renderer format (as negotiated by SpectacularAPIView) -> built file.
+SCHEMA_FILES = {"yaml": "schema.yaml", "json": "schema.json"}
+SPECTACULAR_FORMATS = {"yaml": "openapi", "json": "openapi-json"}
+VERSION_FILE = "schema.version"
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """Fingerprint of the project's Python source and drf-spectacular."""
+    digest = hashlib.sha256(drf_spectacular.__version__.encode())
+    base_dir = Path(settings.BASE_DIR).resolve()
+    for app_config in apps.get_app_configs():
+        app_dir = Path(app_config.path).resolve()
+        if base_dir not in app_dir.parents:
+            continue
+        for path in sorted(app_dir.rglob("*.py")):
+            digest.update(str(path.relative_to(base_dir)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def schema_is_current():
+    docs_root = Path(settings.DOCS_ASSETS_ROOT)
+    try:
+        stamp = (docs_root / VERSION_FILE).read_text().strip()
+    except OSError:
+        return False
+    return stamp == code_version() and all(
+        (docs_root / name).is_file() for name in SCHEMA_FILES.values()
+    )
+
+
+def build_schema():
+    """Generate the schema in each format with compressed variants, then stamp it."""
+    docs_root = Path(settings.DOCS_ASSETS_ROOT)
+    docs_root.mkdir(parents=True, exist_ok=True)
+    for fmt, name in SCHEMA_FILES.items():
+        call_command(
+            "spectacular", file=str(docs_root / name), format=SPECTACULAR_FORMATS[fmt]
+        )
+        precompress_file(docs_root / name)
+    (docs_root / VERSION_FILE).write_text(code_version())
@@ -0,0 +1,45 @@
+import mimetypes
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from plms.compression import SUFFIXES, is_compressible, precompress_file
+from plms.docs import SCHEMA_FILES, VERSION_FILE, build_schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the OpenAPI document into DOCS_ASSETS_ROOT and write .gz/.br "
+        "variants of docs assets and collected static files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--skip-schema",
+            action="store_true",
+            help="Only compress existing files; don't regenerate the schema.",
+        )
+
+    def handle(self, *args, **options):
+        docs_root = Path(settings.DOCS_ASSETS_ROOT)
+        docs_root.mkdir(parents=True, exist_ok=True)
+        if not options["skip_schema"]:
+            build_schema()
+
+        written = 0
+        for root in (docs_root, Path(settings.STATIC_ROOT)):
+            if not root.is_dir():
+                continue
+            for path in sorted(root.rglob("*")):
+                if not path.is_file() or path.suffix in SUFFIXES.values():
+                    continue
+                # build_schema() compresses the schema itself.
+                if root == docs_root and (
+                    path.name in SCHEMA_FILES.values() or path.name == VERSION_FILE
+                ):
+                    continue
+                content_type = mimetypes.guess_type(path.name)[0] or ""
+                if content_type and is_compressible(content_type):
+                    written += len(precompress_file(path))
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} compressed files."))
@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the pre-forking production server (gunicorn), or gracefully "
+        "reload/upgrade a running one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--bind", help=f"Address to listen on (default {settings.SERVE_BIND})."
+        )
+        parser.add_argument(
+            "--workers", type=int, help="Worker processes (default 2 * CPUs + 1)."
+        )
+        parser.add_argument("--threads", type=int, help="Threads per worker.")
+        parser.add_argument(
+            "--max-requests",
+            type=int,
+            help="Recycle a worker after this many requests.",
+        )
+        parser.add_argument(
+            "--access-log", action="store_true", help="Log every request to stdout."
+        )
+        action = parser.add_mutually_exclusive_group()
+        action.add_argument(
+            "--reload",
+            action="store_true",
+            help="Gracefully restart the workers of the running server (HUP).",
+        )
+        action.add_argument(
+            "--upgrade",
+            action="store_true",
+            help="Start a new master with the current code, then stop the old one (USR2 + QUIT).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            from plms import server
+        except ImportError as exc:
+            raise CommandError(
+                f"manage.py serve needs gunicorn ({exc}); it is not available on "
+                "Windows, use runserver there."
+            )
+
+        try:
+            if options["reload"]:
+                pid = server.reload_workers(settings.SERVE_PIDFILE)
+                self.stdout.write(
+                    self.style.SUCCESS(f"Reloading workers of master {pid}.")
+                )
+                return
+            if options["upgrade"]:
+                pid = server.upgrade(settings.SERVE_PIDFILE)
+                self.stdout.write(self.style.SUCCESS(f"New master {pid} is serving."))
+                return
+        except (RuntimeError, OSError) as exc:
+            raise CommandError(str(exc))
+
+        threads = options["threads"]
+        server.run(
+            bind=options["bind"],
+            workers=options["workers"],
+            threads=threads,
+            worker_class="gthread" if threads and threads > 1 else None,
+            max_requests=options["max_requests"],
+            accesslog="-" if options["access_log"] else None,
+        )
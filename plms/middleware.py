@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from .compression import (choose_encoding, compress, compress_async_stream,
+                          compress_stream, encodings_for, is_compressible)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Negotiate ``br``/``gzip``/identity and compress responses, including
+    streaming ones. Small bodies, already-encoded responses, ``no-transform``
+    and incompressible content types pass through untouched.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding") or request.method == "HEAD":
+            return response
+        if not is_compressible(response.get("Content-Type", "")):
+            return response
+        if "no-transform" in response.get("Cache-Control", ""):
+            return response
+        if (
+            not response.streaming
+            and len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(
+            request.META.get("HTTP_ACCEPT_ENCODING", ""),
+            encodings_for(response.get("Content-Type", "")),
+        )
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compress_async_stream(
+                    response.streaming_content, encoding
+                )
+            else:
+                response.streaming_content = compress_stream(
+                    response.streaming_content, encoding
+                )
+            # The compressed size isn't known until the stream ends.
+            del response.headers["Content-Length"]
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,201 @@
+"""
+Pre-forking production server for ``manage.py serve``, built on gunicorn.
+
+The Django app is loaded and warmed once in the master process, then shared
+copy-on-write by every forked worker. Workers are recycled after a number of
+requests or when their resident memory passes a limit.
+
+Zero-downtime operations use gunicorn's signals on the master:
+
+- ``HUP`` starts fresh workers and gracefully stops the old ones;
+- ``USR2`` execs a new master (loading new code) alongside the old one, which
+  is then stopped with ``QUIT`` once the new master is up.
+
+``manage.py serve --reload`` and ``--upgrade`` send these for you.
+"""
+
+import gc
+import logging
+import os
+import signal
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.urls import get_resolver
+from gunicorn.app.base import BaseApplication
+
+from .docs import build_schema, schema_is_current
+
+logger = logging.getLogger(__name__)
+
+
+def default_workers():
+    return settings.SERVE_WORKERS or (os.cpu_count() or 1) * 2 + 1
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB (0 if it can't be read)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            pages = int(fh.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def warm_up():
+    """Do the lazy first-request work before forking."""
+    resolver = get_resolver()
+    resolver.url_patterns
+    resolver.reverse_dict
+
+    # Never serve API docs built from older code.
+    if not schema_is_current():
+        try:
+            build_schema()
+        except Exception:
+            logger.exception("Could not rebuild the OpenAPI schema")
+
+    from rest_framework import serializers
+
+    from users import serializers as user_serializers
+
+    for value in vars(user_serializers).values():
+        if (
+            isinstance(value, type)
+            and issubclass(value, serializers.ModelSerializer)
+            and value is not serializers.ModelSerializer
+        ):
+            value().fields
+
+
+def load_application():
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+    warm_up()
+    # Forked workers must not share the master's database sockets.
+    connections.close_all()
+    # Keep warmed objects out of the collector so it doesn't touch (and
+    # un-share) their pages in every worker.
+    gc.collect()
+    gc.freeze()
+    return application
+
+
+def post_request(worker, req, environ, resp):
+    if current_rss_mb() > settings.SERVE_MAX_WORKER_MEMORY_MB:
+        worker.log.info(
+            "Worker %s over %s MB, recycling",
+            worker.pid,
+            settings.SERVE_MAX_WORKER_MEMORY_MB,
+        )
+        worker.alive = False
+
+
+class Server(BaseApplication):
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return load_application()
+
+
+def run(**overrides):
+    options = {
+        "bind": settings.SERVE_BIND,
+        "workers": default_workers(),
+        "worker_class": "gthread" if settings.SERVE_THREADS > 1 else "sync",
+        "threads": settings.SERVE_THREADS,
+        "preload_app": True,
+        "max_requests": settings.SERVE_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVE_MAX_REQUESTS_JITTER,
+        "timeout": settings.SERVE_TIMEOUT,
+        "graceful_timeout": settings.SERVE_TIMEOUT,
+        "keepalive": 5,
+        "pidfile": str(settings.SERVE_PIDFILE),
+        "post_request": post_request,
+    }
+    options.update(
+        {key: value for key, value in overrides.items() if value is not None}
+    )
+    Server(options).run()
+
+
+def read_pid(path):
+    try:
+        with open(path) as fh:
+            return int(fh.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def parent_pid(pid):
+    """Parent of ``pid`` from ``/proc``, or ``None`` where that isn't available."""
+    try:
+        with open(f"/proc/{pid}/stat") as fh:
+            # The command name may contain spaces; fields resume after ")".
+            return int(fh.read().rsplit(")", 1)[1].split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def is_new_master(pid, old_pid):
+    """``pid`` is a live master re-executed by ``old_pid``."""
+    if pid == old_pid or not is_alive(pid):
+        return False
+    parent = parent_pid(pid)
+    return parent is None or parent == old_pid
+
+
+def reload_workers(pidfile):
+    """Gracefully replace every worker with a freshly forked one."""
+    pid = read_pid(pidfile)
+    if pid is None:
+        raise RuntimeError(f"No running server found via {pidfile}")
+    os.kill(pid, signal.SIGHUP)
+    return pid
+
+
+def upgrade(pidfile, timeout=60):
+    """
+    Start a new master with the current code, wait until it has written its
+    pidfile, then stop the old master gracefully. Returns the new master pid.
+    """
+    old_pid = read_pid(pidfile)
+    if old_pid is None:
+        raise RuntimeError(f"No running server found via {pidfile}")
+    new_pidfile = f"{pidfile}.2"
+    stale_pid = read_pid(new_pidfile)
+    if stale_pid is not None:
+        if is_new_master(stale_pid, old_pid):
+            raise RuntimeError(f"An upgrade is already running (pid {stale_pid}).")
+        # Left behind by an earlier failed upgrade.
+        os.remove(new_pidfile)
+    os.kill(old_pid, signal.SIGUSR2)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        new_pid = read_pid(new_pidfile)
+        if new_pid and is_new_master(new_pid, old_pid):
+            os.kill(old_pid, signal.SIGQUIT)
+            return new_pid
+        time.sleep(0.2)
+    raise RuntimeError("New master did not start; the old one keeps serving.")
@@ -25,12 +25,15 @@ INSTALLED_APPS = [
     "drf_spectacular",
     "django_filters",
     "corsheaders",
+    "jobs",
+    "plms",
     "users",
 ]
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "plms.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -67,6 +70,38 @@ DATABASES = {
     }
 }
 
+# Background jobs live in their own SQLite file, outside the main database
+JOBS_DATABASE = BASE_DIR / "jobs.sqlite3"
+JOBS_WORKER_THREADS = 4
+JOBS_BATCH_SIZE = 20
+JOBS_POLL_INTERVAL = 1.0
+JOBS_MAX_ATTEMPTS = 5
+JOBS_BACKOFF_BASE = 2.0
+JOBS_BACKOFF_MAX = 600.0
+JOBS_LEASE_SECONDS = 300
+JOBS_RETENTION_SECONDS = 7 * 24 * 3600
+JOBS_METRICS_INTERVAL = 60
+
+# Cache: per-process L1 in front of a SQLite file shared by all workers on the
+# node (see plms/cache.py). Bump EPOCH to invalidate everything on deploy.
+CACHES = {
+    "default": {
+        "BACKEND": "plms.cache.TieredCache",
+        "LOCATION": str(BASE_DIR / "cache.sqlite3"),
+        "TIMEOUT": 300,
+        "OPTIONS": {
+            "MAX_ENTRIES": 100000,
+            "L1_MAX_ENTRIES": 2048,
+            "L1_TIMEOUT": 5,
+            "EPOCH": "1",
+            "LOCK_TIMEOUT": 10,
+        },
+    }
+}
+
+# Tests use temporary cache and job queue files (see plms/test_runner.py).
+TEST_RUNNER = "plms.test_runner.TestRunner"
+
 # Custom User Model
 AUTH_USER_MODEL = "users.User"
 
@@ -86,6 +121,10 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Email
+EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+DEFAULT_FROM_EMAIL = "PLMS <no-reply@plms.local>"
+
 # Internationalization
 LANGUAGE_CODE = "vi"
 TIME_ZONE = "Asia/Ho_Chi_Minh"
@@ -94,6 +133,20 @@ USE_TZ = True
 
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = "static/"
+STATIC_ROOT = BASE_DIR / "staticfiles"
+STATIC_MAX_AGE = 3600
+
+# Pre-built API docs (manage.py compress_assets)
+DOCS_ASSETS_ROOT = BASE_DIR / "docs_assets"
+
+# Response compression (plms.middleware.CompressionMiddleware)
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_BROTLI_QUALITY = 4
+COMPRESSION_RANDOM_BYTES = 100
+
+# Uploaded files (avatars)
+MEDIA_URL = "media/"
+MEDIA_ROOT = BASE_DIR / "media"
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -101,7 +154,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # REST Framework Configuration
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.JWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -132,3 +185,40 @@ SPECTACULAR_SETTINGS = {
     "DESCRIPTION": "Personal Learning Management System API",
     "VERSION": "1.0.0",
 }
+
+# Users API
+USERS_BATCH_MAX_SIZE = 500
+USERS_PROFILE_CACHE_TIMEOUT = 300
+USERS_CHANGES_BATCH_SIZE = 500
+USERS_CHANGES_RETENTION_DAYS = 30
+# Seconds new change-feed entries are held back on databases other than
+# SQLite; write transactions that log changes must finish within it.
+USERS_CHANGES_COMMIT_LAG = 5
+AVATAR_MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+AVATAR_THUMBNAIL_SIZES = (64, 128, 256)
+AVATAR_THUMBNAIL_WORKERS = 2
+
+# Role permissions: seconds between checks for a newer shared role table,
+# and how long the shared table is cached
+ROLE_PERMISSIONS_RECHECK = 5
+ROLE_PERMISSIONS_CACHE_TIMEOUT = 300
+
+# Token introspection (POST /api/auth/introspect/)
+INTROSPECTION_MAX_TOKENS = 1000
+INTROSPECTION_INVALID_TIMEOUT = 60
+
+# Idempotency-Key replay store (per process)
+IDEMPOTENCY_MAX_ENTRIES = 10000
+IDEMPOTENCY_TTL = 3600
+IDEMPOTENCY_TOKEN_TTL = 60
+IDEMPOTENCY_WAIT_TIMEOUT = 30
+
+# Production server (manage.py serve); SERVE_WORKERS = None means 2 * CPUs + 1
+SERVE_BIND = "127.0.0.1:8000"
+SERVE_WORKERS = None
+SERVE_THREADS = 1
+SERVE_MAX_REQUESTS = 5000
+SERVE_MAX_REQUESTS_JITTER = 500
+SERVE_MAX_WORKER_MEMORY_MB = 512
+SERVE_TIMEOUT = 30
+SERVE_PIDFILE = BASE_DIR / "serve.pid"
@@ -0,0 +1,31 @@
+import copy
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Run tests against throwaway copies of the SQLite side stores, so a test
+    run never writes to, or ``cache.clear()``s, the files a local server on
+    the same checkout is using.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._tmp = Path(tempfile.mkdtemp(prefix="plms-test-"))
+        caches = copy.deepcopy(settings.CACHES)
+        caches["default"]["LOCATION"] = str(self._tmp / "cache.sqlite3")
+        self._override = override_settings(
+            CACHES=caches, JOBS_DATABASE=self._tmp / "jobs.sqlite3"
+        )
+        self._override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._override.disable()
+        shutil.rmtree(self._tmp, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
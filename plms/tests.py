@@ -0,0 +1,251 @@
+import contextlib
+import gzip
+import io
+import json
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+import brotli
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from .cache import TieredCache
+from .compression import choose_encoding, precompress_file
+from .docs import VERSION_FILE, build_schema
+from .middleware import CompressionMiddleware
+from .server import upgrade
+from .views import serve_precompressed
+
+BODY = json.dumps([{"id": i, "username": f"user{i}"} for i in range(200)]).encode()
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    def run_middleware(self, response, accept="br, gzip"):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda r: response)(request)
+
+    def test_negotiation(self):
+        self.assertEqual(choose_encoding("gzip, br"), "br")
+        self.assertEqual(choose_encoding("br;q=0.5, gzip"), "gzip")
+        self.assertEqual(choose_encoding("*;q=0.1"), "br")
+        self.assertIsNone(choose_encoding("identity"))
+        self.assertIsNone(choose_encoding("br;q=0, gzip;q=0"))
+
+    def test_compresses_large_bodies(self):
+        response = self.run_middleware(
+            HttpResponse(BODY, content_type="application/json")
+        )
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content), BODY)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+        response = self.run_middleware(
+            HttpResponse(BODY, content_type="application/json"), accept="gzip"
+        )
+        self.assertEqual(gzip.decompress(response.content), BODY)
+
+    def test_html_only_gets_padded_gzip(self):
+        html = b"<p>" + BODY + b"</p>"
+        response = self.run_middleware(
+            HttpResponse(html, content_type="text/html; charset=utf-8")
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), html)
+
+    def test_skips_small_and_incompressible_bodies(self):
+        small = self.run_middleware(
+            HttpResponse(b"{}", content_type="application/json")
+        )
+        self.assertFalse(small.has_header("Content-Encoding"))
+        image = self.run_middleware(HttpResponse(BODY, content_type="image/png"))
+        self.assertFalse(image.has_header("Content-Encoding"))
+
+    def test_streaming_responses(self):
+        chunks = [BODY[i : i + 1000] for i in range(0, len(BODY), 1000)]
+        response = self.run_middleware(
+            StreamingHttpResponse(iter(chunks), content_type="application/json")
+        )
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(b"".join(response.streaming_content)), BODY)
+
+
+class PrecompressedFileTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        (self.root / "app.js").write_bytes(b"console.log('plms');\n" * 200)
+
+    def get(self, accept):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept)
+        return serve_precompressed(request, "app.js", self.root)
+
+    def test_serves_best_available_variant(self):
+        self.assertEqual(len(precompress_file(self.root / "app.js")), 2)
+        response = self.get("gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(response["Content-Type"], "text/javascript")
+        self.assertEqual(
+            brotli.decompress(b"".join(response.streaming_content)),
+            (self.root / "app.js").read_bytes(),
+        )
+        self.assertFalse(self.get("identity").has_header("Content-Encoding"))
+
+    @override_settings(COMPRESSION_MIN_SIZE=10**6)
+    def test_small_files_are_left_alone(self):
+        self.assertEqual(precompress_file(self.root / "app.js"), [])
+        self.assertFalse(self.get("gzip").has_header("Content-Encoding"))
+
+
+class PrebuiltSchemaTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        override = override_settings(DOCS_ASSETS_ROOT=self.root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def get(self, accept="*/*"):
+        return self.client.get(
+            "/api/schema/", HTTP_ACCEPT=accept, HTTP_ACCEPT_ENCODING="gzip"
+        )
+
+    def test_prebuilt_schema_is_served_only_for_current_code(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            build_schema()
+        response = self.get()
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIsInstance(response, FileResponse)
+
+        self.assertEqual(
+            response["Content-Type"], "application/vnd.oai.openapi; charset=utf-8"
+        )
+        self.assertIn("Accept", response["Vary"])
+
+        response = self.get("application/json")
+        self.assertIsInstance(response, FileResponse)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(
+            json.loads(gzip.decompress(b"".join(response.streaming_content)))[
+                "openapi"
+            ][:2],
+            "3.",
+        )
+
+        (self.root / VERSION_FILE).write_text("older code")
+        self.assertNotIsInstance(self.get(), FileResponse)
+
+
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def make_cache(self, **options):
+        options = {"L1_TIMEOUT": 60, **options}
+        return TieredCache(f"{self.tmp}/cache.sqlite3", {"OPTIONS": options})
+
+    def test_workers_share_l2(self):
+        a, b = self.make_cache(), self.make_cache()
+        a.set("users:profile:1", {"id": 1})
+        self.assertEqual(b.get("users:profile:1"), {"id": 1})
+        self.assertEqual(
+            b.get_many(["users:profile:1", "users:profile:2"]),
+            {"users:profile:1": {"id": 1}},
+        )
+        self.assertEqual(b.stats()["users"], {"l2_hits": 1, "l1_hits": 1, "misses": 1})
+
+    def test_l1_staleness_is_bounded(self):
+        a, b = self.make_cache(L1_TIMEOUT=0.1), self.make_cache(L1_TIMEOUT=0.1)
+        a.set("k", 1)
+        self.assertEqual(b.get("k"), 1)
+        a.delete("k")
+        self.assertEqual(b.get("k"), 1)
+        time.sleep(0.15)
+        self.assertIsNone(b.get("k"))
+
+    def test_expiry_add_touch(self):
+        cache = self.make_cache()
+        cache.set("k", "v", timeout=0.05)
+        self.assertFalse(cache.add("k", "other"))
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("k"))
+        self.assertTrue(cache.add("k", "other"))
+        self.assertTrue(cache.touch("k", 100))
+        self.assertEqual(cache.get("k"), "other")
+
+    def test_epoch_change_invalidates(self):
+        self.make_cache(EPOCH="1").set("k", "old")
+        self.assertIsNone(self.make_cache(EPOCH="2").get("k"))
+
+    def test_get_or_set_computes_once_under_concurrency(self):
+        cache = self.make_cache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(cache.get_or_set("slow", compute))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 8)
+
+    def test_slow_values_refresh_early(self):
+        cache = self.make_cache()
+        cache._store(cache.make_key("k"), "stale", timeout=1, delta=100.0)
+        self.assertEqual(cache.get_or_set("k", lambda: "fresh"), "fresh")
+        self.assertEqual(cache.stats()["default"]["early_refreshes"], 1)
+
+
+class ServerUpgradeTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        self.pidfile = Path(tmp) / "serve.pid"
+        self.pidfile.write_text("100")
+        self.sent = []
+        self.alive = {100}
+
+    def fake_kill(self, pid, sig):
+        if sig == 0:
+            if pid not in self.alive:
+                raise ProcessLookupError
+            return
+        self.sent.append((pid, sig))
+
+    def test_stale_new_master_pidfile_does_not_stop_old_master(self):
+        Path(f"{self.pidfile}.2").write_text("200")
+        with mock.patch("plms.server.os.kill", self.fake_kill):
+            with self.assertRaises(RuntimeError):
+                upgrade(self.pidfile, timeout=0.3)
+        self.assertEqual(self.sent, [(100, signal.SIGUSR2)])
+        self.assertFalse(Path(f"{self.pidfile}.2").exists())
+
+    def test_quits_old_master_once_new_one_is_up(self):
+        def kill(pid, sig):
+            self.fake_kill(pid, sig)
+            if sig == signal.SIGUSR2:
+                self.alive.add(300)
+                Path(f"{self.pidfile}.2").write_text("300")
+
+        with mock.patch("plms.server.os.kill", kill), mock.patch(
+            "plms.server.parent_pid", return_value=100
+        ):
+            self.assertEqual(upgrade(self.pidfile, timeout=1), 300)
+        self.assertEqual(self.sent, [(100, signal.SIGUSR2), (100, signal.SIGQUIT)])
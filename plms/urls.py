@@ -15,13 +15,25 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
 from django.contrib import admin
-from django.urls import include, path
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from django.urls import include, path, re_path
+from drf_spectacular.views import SpectacularSwaggerView
+
+from users.urls import user_urlpatterns
+
+from .views import CacheStatsAPI, schema_view, serve_precompressed
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("api/schema/", schema_view, name="schema"),
     path("api/docs/", SpectacularSwaggerView.as_view(url_name="schema")),
     path("api/auth/", include("users.urls")),
+    path("api/users/", include(user_urlpatterns)),
+    path("api/cache/stats/", CacheStatsAPI.as_view()),
+    re_path(
+        r"^static/(?P<path>.+)$",
+        serve_precompressed,
+        {"document_root": settings.STATIC_ROOT},
+    ),
 ]
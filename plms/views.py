@@ -0,0 +1,105 @@
+import mimetypes
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework import permissions
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .compression import STATIC_ENCODINGS, SUFFIXES, choose_encoding
+from .docs import SCHEMA_FILES, schema_is_current
+
+
+def serve_precompressed(request, path, document_root, content_type=None):
+    """
+    Serve a file from ``document_root``, preferring a ``.br``/``.gz`` sibling
+    written by ``manage.py compress_assets`` when the client accepts it.
+    """
+    full_path = safe_join(document_root, path)
+    if not os.path.isfile(full_path):
+        raise Http404
+    stat = os.stat(full_path)
+    if not was_modified_since(
+        request.META.get("HTTP_IF_MODIFIED_SINCE"), stat.st_mtime
+    ):
+        return HttpResponseNotModified()
+
+    available = [
+        encoding
+        for encoding in STATIC_ENCODINGS
+        if os.path.isfile(full_path + SUFFIXES[encoding])
+    ]
+    encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""), available)
+    serve_path = full_path + SUFFIXES[encoding] if encoding else full_path
+    content_type = content_type or mimetypes.guess_type(full_path)[0]
+
+    response = FileResponse(
+        open(serve_path, "rb"),
+        content_type=content_type or "application/octet-stream",
+    )
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Last-Modified"] = http_date(stat.st_mtime)
+    response.headers["Cache-Control"] = f"public, max-age={settings.STATIC_MAX_AGE}"
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+live_schema_view = SpectacularAPIView.as_view()
+
+
+def schema_renderer(request):
+    """The renderer ``SpectacularAPIView`` would pick for this ``Accept``."""
+    renderers = [renderer() for renderer in SpectacularAPIView.renderer_classes]
+    try:
+        renderer, _ = DefaultContentNegotiation().select_renderer(
+            Request(request), renderers
+        )
+    except NotAcceptable:
+        return None
+    return renderer
+
+
+def schema_view(request, *args, **kwargs):
+    """
+    Serve the OpenAPI document built by ``compress_assets`` from disk in the
+    format the client negotiated, falling back to generating it per request
+    when the built files are missing or older than the code, or a specific
+    format/version is asked for.
+    """
+    renderer = None
+    if not request.GET and schema_is_current():
+        renderer = schema_renderer(request)
+    if renderer is None:
+        return live_schema_view(request, *args, **kwargs)
+    content_type = renderer.media_type
+    if renderer.charset:
+        content_type += f"; charset={renderer.charset}"
+    response = serve_precompressed(
+        request,
+        SCHEMA_FILES[renderer.format],
+        settings.DOCS_ASSETS_ROOT,
+        content_type,
+    )
+    patch_vary_headers(response, ("Accept",))
+    return response
+
+
+class CacheStatsAPI(APIView):
+    """Per-namespace cache hit/miss counters for the worker serving the request."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        stats = cache.stats() if hasattr(cache, "stats") else {}
+        return Response({"pid": os.getpid(), "namespaces": stats}, status=200)
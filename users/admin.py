@@ -1,3 +1,234 @@
-from django.contrib import admin
+import sys
 
-# Register your models here.
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.views.main import PAGE_VAR
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.auth.forms import AdminUserCreationForm
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+
+from .changes import record_bulk_change
+from .models import RevokedToken, RolePermissionOverride, User
+from .profiles import invalidate_profiles
+
+# Keeps each UPDATE's id list under SQLite's bound-parameter limit.
+UPDATE_BATCH_SIZE = 1000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Avoid ``COUNT(*)`` over the whole table. Rows are only counted as far as
+    ``lookahead_pages`` past the requested page; when there are more than
+    that, ``count`` is the table's row estimate (unfiltered lists) or the
+    lower bound, and ``is_estimate`` is set. Every page stays reachable: a
+    request for page ``n`` always counts far enough to include it.
+    """
+
+    lookahead_pages = 10
+
+    def __init__(self, object_list, per_page, *args, page=1, **kwargs):
+        super().__init__(object_list, per_page, *args, **kwargs)
+        self.requested_page = max(page, 1)
+        self.is_estimate = False
+
+    @cached_property
+    def count(self):
+        bound = (self.requested_page + self.lookahead_pages) * self.per_page + 1
+        counted = self.object_list.order_by()[:bound].count()
+        if counted < bound:
+            return counted
+        self.is_estimate = True
+        if not self.object_list.query.where:
+            estimate = estimated_rows(self.object_list.model, self.object_list.db)
+            if estimate is not None and estimate > counted:
+                return estimate
+        return counted
+
+
+def estimated_rows(model, using):
+    """Cheap row estimate for ``model``'s table, or ``None`` if there is none."""
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [table],
+            )
+        elif connection.vendor == "mysql":
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables"
+                " WHERE table_schema = DATABASE() AND table_name = %s",
+                [table],
+            )
+        elif connection.vendor == "sqlite":
+            # Filled in by ANALYZE; every stat starts with the table's row count.
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table'"
+                " AND name = 'sqlite_stat1'"
+            )
+            if cursor.fetchone() is not None:
+                cursor.execute(
+                    "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table]
+                )
+                row = cursor.fetchone()
+                if row:
+                    return int(row[0].split()[0])
+            # Without statistics the highest id, read straight off the
+            # primary key index, is close enough for an append-mostly table.
+            cursor.execute(
+                "SELECT MAX(%s) FROM %s"
+                % (
+                    connection.ops.quote_name(model._meta.pk.column),
+                    connection.ops.quote_name(table),
+                )
+            )
+        else:
+            return None
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] and row[0] > 0 else None
+
+
+def prefix_range(field, prefix):
+    """``field`` starts with ``prefix``, as a range an index can serve."""
+    if ord(prefix[-1]) == sys.maxunicode:
+        return Q(**{f"{field}__startswith": prefix})
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f"{field}__gte": prefix, f"{field}__lt": upper})
+
+
+class UserCreationForm(AdminUserCreationForm):
+    class Meta(AdminUserCreationForm.Meta):
+        model = User
+        # email is unique, so it can't be left blank.
+        fields = ("username", "email")
+
+
+class UserActionForm(ActionForm):
+    role = forms.ChoiceField(
+        choices=[("", "---------"), *User.ROLE_CHOICES], required=False
+    )
+    ab_group = forms.CharField(max_length=8, required=False, label="Cohort")
+
+
+@admin.register(User)
+class UserAdmin(BaseUserAdmin):
+    list_display = (
+        "id",
+        "username",
+        "email",
+        "role",
+        "ab_group",
+        "locale",
+        "is_active",
+        "date_joined",
+    )
+    list_filter = ("role", "ab_group", "locale")
+    # See get_search_results: index range scans, never LIKE.
+    search_fields = ("username", "email")
+    search_help_text = "Username or email prefix (case-sensitive), or an exact id."
+    # Newest first on the primary key, so paging walks the index.
+    ordering = ("-id",)
+    sortable_by = ("id", "username", "email")
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    list_per_page = 100
+    action_form = UserActionForm
+    actions = ("set_role", "set_ab_group", "revoke_tokens")
+    fieldsets = BaseUserAdmin.fieldsets + (
+        ("PLMS", {"fields": ("role", "locale", "ab_group", "avatar")}),
+    )
+    add_form = UserCreationForm
+    add_fieldsets = (
+        (
+            None,
+            {
+                "classes": ("wide",),
+                "fields": (
+                    "username",
+                    "email",
+                    "usable_password",
+                    "password1",
+                    "password2",
+                ),
+            },
+        ),
+    )
+
+    def get_paginator(self, request, queryset, per_page, *args, **kwargs):
+        try:
+            page = int(request.GET.get(PAGE_VAR, 1))
+        except ValueError:
+            page = 1
+        return self.paginator(queryset, per_page, *args, page=page, **kwargs)
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        # ``startswith`` compiles to LIKE, which SQLite can't serve from an
+        # index on these columns; a range on the unique indexes it can.
+        query = prefix_range("username", term) | prefix_range("email", term)
+        if term.isdigit():
+            query |= Q(pk=int(term))
+        return queryset.filter(query), False
+
+    def update_selected(self, request, queryset, **values):
+        """
+        Apply ``values`` to the selected users with one UPDATE per
+        ``UPDATE_BATCH_SIZE`` rows, then do what ``User.post_save`` receivers
+        would: log the change feed and drop cached profiles.
+        """
+        ids = list(queryset.order_by().values_list("pk", flat=True))
+        updated = 0
+        with transaction.atomic():
+            for start in range(0, len(ids), UPDATE_BATCH_SIZE):
+                batch = ids[start : start + UPDATE_BATCH_SIZE]
+                updated += User.objects.filter(pk__in=batch).update(**values)
+                record_bulk_change(User.objects.filter(pk__in=batch))
+            transaction.on_commit(lambda: invalidate_profiles(ids))
+        return updated
+
+    @admin.action(description="Set role of selected users")
+    def set_role(self, request, queryset):
+        role = request.POST.get("role")
+        if role not in dict(User.ROLE_CHOICES):
+            self.message_user(request, "Choose a role.", messages.ERROR)
+            return
+        updated = self.update_selected(request, queryset, role=role)
+        self.message_user(request, f"Set role to {role} for {updated} users.")
+
+    @admin.action(description="Set cohort (A/B group) of selected users")
+    def set_ab_group(self, request, queryset):
+        ab_group = request.POST.get("ab_group", "").strip()
+        if not ab_group or len(ab_group) > 8:
+            self.message_user(
+                request, "Enter a cohort of at most 8 characters.", messages.ERROR
+            )
+            return
+        updated = self.update_selected(request, queryset, ab_group=ab_group)
+        self.message_user(request, f"Moved {updated} users to cohort {ab_group}.")
+
+    @admin.action(description="Revoke all tokens of selected users")
+    def revoke_tokens(self, request, queryset):
+        updated = self.update_selected(
+            request, queryset, token_version=F("token_version") + 1
+        )
+        self.message_user(request, f"Revoked tokens of {updated} users.")
+
+
+@admin.register(RolePermissionOverride)
+class RolePermissionOverrideAdmin(admin.ModelAdmin):
+    list_display = ("role", "permission", "granted")
+    list_filter = ("role", "granted")
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    list_display = ("jti", "expires_at", "created_at")
+    search_fields = ("=jti",)
+    ordering = ("-id",)
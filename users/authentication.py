@@ -0,0 +1,24 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt import authentication
+
+from .introspection import is_revoked
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    """
+    simplejwt authentication that also rejects tokens issued before the
+    user's ``token_version`` was bumped and tokens revoked by ``jti``, the
+    same checks ``/api/auth/introspect/`` applies for the gateway.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if is_revoked(validated_token, user):
+            raise AuthenticationFailed("Token has been revoked.", code="token_revoked")
+        return user
+
+
+class JWTScheme(SimpleJWTScheme):
+    # simplejwt's own scheme only matches its exact class, not subclasses.
+    target_class = JWTAuthentication
@@ -0,0 +1,163 @@
+import hashlib
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import (StopUpload,
+                                             TemporaryFileUploadHandler)
+from django.db import transaction
+from django.urls import reverse
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - thumbnails are optional
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Leading bytes of the image formats we accept, mapped to a file extension.
+SIGNATURES = {
+    b"\x89PNG\r\n\x1a\n": "png",
+    b"\xff\xd8\xff": "jpg",
+    b"GIF87a": "gif",
+    b"GIF89a": "gif",
+}
+CONTENT_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "gif": "image/gif",
+    "webp": "image/webp",
+}
+THUMBNAIL_FORMAT = "webp"
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.AVATAR_THUMBNAIL_WORKERS, thread_name_prefix="avatars"
+)
+
+
+def sniff_extension(head):
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    for signature, ext in SIGNATURES.items():
+        if head.startswith(signature):
+            return ext
+    return None
+
+
+class AvatarUploadHandler(TemporaryFileUploadHandler):
+    """
+    Stream an avatar to a temporary file chunk by chunk, hashing as it goes,
+    so the upload is never held in memory.
+    """
+
+    too_large = False
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+        self.head = b""
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.AVATAR_MAX_UPLOAD_SIZE:
+            self.too_large = True
+            self.file.close()
+            # Stop reading the body instead of draining it before the 413.
+            raise StopUpload(connection_reset=True)
+        if len(self.head) < 16:
+            self.head += raw_data[: 16 - len(self.head)]
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.sha256.hexdigest()
+        file.extension = sniff_extension(self.head)
+        return file
+
+
+def avatar_dir(digest):
+    return f"avatars/{digest[:2]}/{digest}"
+
+
+def original_name(digest, ext):
+    return f"{avatar_dir(digest)}/original.{ext}"
+
+
+def thumbnail_name(digest, size):
+    return f"{avatar_dir(digest)}/{size}.{THUMBNAIL_FORMAT}"
+
+
+def find_original(digest):
+    for ext in CONTENT_TYPES:
+        name = original_name(digest, ext)
+        if default_storage.exists(name):
+            return name
+    return None
+
+
+def store_avatar(uploaded):
+    """
+    Move a streamed upload into content-addressed storage and return its
+    digest. Re-uploading bytes that are already stored just drops the copy.
+    """
+    digest, name = uploaded.sha256, original_name(uploaded.sha256, uploaded.extension)
+    if default_storage.exists(name):
+        uploaded.close()
+        return digest
+    saved = default_storage.save(name, uploaded)
+    if saved != name:
+        # Lost a race with an identical concurrent upload.
+        default_storage.delete(saved)
+    return digest
+
+
+def generate_thumbnails(digest):
+    if Image is None:
+        logger.warning("Pillow is not installed; skipping avatar thumbnails.")
+        return
+    source = find_original(digest)
+    if source is None:
+        return
+    with default_storage.open(source) as fh, Image.open(fh) as image:
+        image.load()
+        for size in settings.AVATAR_THUMBNAIL_SIZES:
+            name = thumbnail_name(digest, size)
+            if default_storage.exists(name):
+                continue
+            thumb = image.copy()
+            thumb.thumbnail((size, size))
+            buffer = io.BytesIO()
+            thumb.save(buffer, format=THUMBNAIL_FORMAT)
+            default_storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def schedule_thumbnails(digest):
+    """
+    Generate thumbnails in this process once the upload commits. If the
+    worker dies first, ``AvatarFileAPI`` re-queues them as a durable job.
+    """
+
+    def submit():
+        future = _executor.submit(generate_thumbnails, digest)
+        future.add_done_callback(_log_failure)
+
+    transaction.on_commit(submit)
+
+
+def _log_failure(future):
+    if future.exception() is not None:
+        logger.error("Avatar thumbnail generation failed", exc_info=future.exception())
+
+
+def original_url(digest):
+    return reverse("avatar-file", args=[digest, "original"])
+
+
+def thumbnail_urls(digest):
+    return {
+        str(size): reverse("avatar-file", args=[digest, f"{size}.{THUMBNAIL_FORMAT}"])
+        for size in settings.AVATAR_THUMBNAIL_SIZES
+    }
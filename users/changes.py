@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import UserChange
+from .serializers import UserSerializer
+
+# Saves that only touch these fields are not interesting downstream.
+IGNORED_FIELDS = frozenset({"last_login"})
+
+
+def snapshot(user):
+    return {**UserSerializer(user).data, "is_active": user.is_active}
+
+
+def record_change(user, action):
+    return UserChange.objects.create(
+        user_id=user.pk, action=action, data=snapshot(user)
+    )
+
+
+def record_bulk_change(users, action="update"):
+    return UserChange.objects.bulk_create(
+        [
+            UserChange(user_id=user.pk, action=action, data=snapshot(user))
+            for user in users
+        ]
+    )
+
+
+def commit_lag():
+    """
+    Seconds a change is held back before it is served.
+
+    Ids are assigned at insert time. SQLite runs one write transaction at a
+    time, so there id order is commit order. Elsewhere a lower id can commit
+    after a higher one; holding back recent entries gives such transactions
+    time to commit before a consumer's cursor moves past them.
+    """
+    return 0 if connection.vendor == "sqlite" else settings.USERS_CHANGES_COMMIT_LAG
+
+
+def changes_since(cursor, limit):
+    """
+    Return up to ``limit`` changes after ``cursor`` (a change id) in id order,
+    plus the cursor to resume from and whether more are pending. Paging stops
+    at the first change younger than ``commit_lag()``.
+    """
+    changes = list(UserChange.objects.filter(pk__gt=cursor).order_by("pk")[: limit + 1])
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    lag = commit_lag()
+    if lag:
+        horizon = timezone.now() - timedelta(seconds=lag)
+        for index, change in enumerate(changes):
+            if change.created_at > horizon:
+                changes, has_more = changes[:index], True
+                break
+    next_cursor = changes[-1].pk if changes else cursor
+    return changes, next_cursor, has_more
+
+
+def compact_changes(before):
+    """
+    Delete entries created before ``before`` that are superseded by a newer
+    entry for the same user. The newest entry per user is always kept, so a
+    consumer replaying from an old cursor still converges on current state.
+    """
+    latest = (
+        UserChange.objects.values("user_id").annotate(latest=Max("pk")).values("latest")
+    )
+    deleted, _ = (
+        UserChange.objects.filter(created_at__lt=before).exclude(pk__in=latest).delete()
+    )
+    return deleted
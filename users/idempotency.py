@@ -0,0 +1,127 @@
+"""
+``Idempotency-Key`` support for POST endpoints that clients retry.
+
+The first request with a given key runs normally and its response is kept in a
+bounded, per-process store for ``IDEMPOTENCY_TTL`` seconds, or the view's
+``idempotency_ttl``. Retries replay that
+response; retries that arrive while the first request is still running wait
+for it instead of repeating the work.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class Entry:
+    __slots__ = ("fingerprint", "expires_at", "done", "response")
+
+    def __init__(self, fingerprint, expires_at):
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+        self.done = threading.Event()
+        self.response = None
+
+
+class IdempotencyStore:
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def begin(self, key, fingerprint, ttl=None):
+        """Return ``(entry, owner)``; ``owner`` is True if the caller must do the work."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > now:
+                self._entries.move_to_end(key)
+                return entry, False
+            entry = Entry(fingerprint, now + (ttl or self.ttl))
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry, True
+
+    def finish(self, entry, response):
+        entry.response = response
+        entry.done.set()
+
+    def abandon(self, key, entry):
+        """Forget an attempt that should not be replayed, releasing any waiters."""
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+        entry.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+store = IdempotencyStore(settings.IDEMPOTENCY_MAX_ENTRIES, settings.IDEMPOTENCY_TTL)
+
+
+def replay(entry):
+    status, content, content_type = entry.response
+    response = HttpResponse(content, status=status, content_type=content_type)
+    response[REPLAYED_HEADER] = "true"
+    return response
+
+
+class IdempotentMixin:
+    """Honour ``Idempotency-Key`` on POST for an ``APIView``."""
+
+    # Seconds to replay a response; None uses IDEMPOTENCY_TTL.
+    idempotency_ttl = None
+
+    def dispatch(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if request.method != "POST" or not key:
+            return super().dispatch(request, *args, **kwargs)
+        if len(key) > 255:
+            return JsonResponse({"detail": f"{HEADER} is too long."}, status=400)
+
+        # Scoped per endpoint; the body is hashed so credentials aren't kept.
+        store_key = f"{request.path}:{key}"
+        fingerprint = hashlib.sha256(request.body).hexdigest()
+        entry, owner = store.begin(store_key, fingerprint, self.idempotency_ttl)
+        if entry.fingerprint != fingerprint:
+            return JsonResponse(
+                {"detail": f"{HEADER} was already used with a different request."},
+                status=422,
+            )
+        if not owner:
+            if not entry.done.wait(settings.IDEMPOTENCY_WAIT_TIMEOUT):
+                return JsonResponse(
+                    {"detail": "The original request is still in progress."},
+                    status=409,
+                )
+            if entry.response is not None:
+                return replay(entry)
+            # The original attempt was abandoned; run this one normally.
+            return super().dispatch(request, *args, **kwargs)
+
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code >= 500:
+                store.abandon(store_key, entry)
+                return response
+            if hasattr(response, "render"):
+                response.render()
+        except BaseException:
+            store.abandon(store_key, entry)
+            raise
+        store.finish(
+            entry, (response.status_code, response.content, response["Content-Type"])
+        )
+        return response
@@ -0,0 +1,130 @@
+"""
+Batch token introspection for the API gateway (``POST /api/auth/introspect/``).
+
+Verifying a signature is the expensive part and its outcome never changes, so
+the verified claims are cached per token (keyed by its sha256); tokens that
+fail verification are remembered for ``INTROSPECTION_INVALID_TIMEOUT`` seconds.
+A batch's verified claims are written together, kept as long as its
+longest-lived token, since ``introspect`` re-checks ``exp`` anyway. Revocation and ``token_version`` can
+change at any moment, so they are checked on every call with one query each
+for the whole batch.
+"""
+
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.state import token_backend
+
+from .models import RevokedToken, User
+
+VERIFIED_KEY = "tokens:verified:{}"
+TOKEN_VERSION_CLAIM = "token_version"
+
+
+def verified_key(token):
+    return VERIFIED_KEY.format(hashlib.sha256(token.encode()).hexdigest())
+
+
+def verify(token):
+    """Return the claims of a correctly signed, unexpired token, else ``None``."""
+    try:
+        return token_backend.decode(token, verify=True)
+    except TokenBackendError:
+        return None
+
+
+def verified_claims(tokens):
+    """Return ``{token: claims or None}``, verifying only tokens not cached yet."""
+    keys = {token: verified_key(token) for token in tokens}
+    cached = cache.get_many(keys.values())
+    claims, valid, invalid = {}, {}, {}
+    now = time.time()
+    timeout = 0
+    for token, key in keys.items():
+        if key in cached:
+            # Invalid tokens are cached as False.
+            claims[token] = cached[key] or None
+            continue
+        payload = verify(token)
+        claims[token] = payload
+        if payload is None:
+            invalid[key] = False
+        elif payload.get("exp", 0) > now:
+            valid[key] = payload
+            timeout = max(timeout, payload["exp"] - now)
+    # One write per batch: every cache write is its own transaction.
+    if valid:
+        lifetime = api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+        cache.set_many(valid, min(timeout, lifetime))
+    if invalid:
+        cache.set_many(invalid, settings.INTROSPECTION_INVALID_TIMEOUT)
+    return claims
+
+
+def introspect(tokens):
+    """
+    Return one result per token, in order: ``{"active": True, **claims}`` for
+    a live access token, otherwise ``{"active": False}``.
+    """
+    claims = verified_claims(tokens)
+    live = [payload for payload in claims.values() if payload]
+    versions, revoked = {}, set()
+    if live:
+        user_ids = {payload.get(api_settings.USER_ID_CLAIM) for payload in live}
+        versions = {
+            str(pk): version
+            for pk, version in User.objects.filter(
+                pk__in=user_ids, is_active=True
+            ).values_list("pk", "token_version")
+        }
+        revoked = set(
+            RevokedToken.objects.filter(
+                jti__in={payload.get(api_settings.JTI_CLAIM) for payload in live}
+            ).values_list("jti", flat=True)
+        )
+
+    now = time.time()
+    results = []
+    for token in tokens:
+        payload = claims[token]
+        active = (
+            payload is not None
+            and payload.get("exp", 0) > now
+            and payload.get(api_settings.TOKEN_TYPE_CLAIM) == "access"
+            and payload.get(api_settings.JTI_CLAIM) not in revoked
+            # Tokens issued before token_version existed count as version 0.
+            and versions.get(str(payload.get(api_settings.USER_ID_CLAIM)))
+            == payload.get(TOKEN_VERSION_CLAIM, 0)
+        )
+        results.append({"active": True, **payload} if active else {"active": False})
+    return results
+
+
+def is_revoked(claims, user):
+    """Whether a verified token was revoked by ``jti`` or by ``token_version``."""
+    # Tokens issued before token_version existed count as version 0.
+    if claims.get(TOKEN_VERSION_CLAIM, 0) != user.token_version:
+        return True
+    jti = claims.get(api_settings.JTI_CLAIM)
+    return bool(jti) and RevokedToken.objects.filter(jti=jti).exists()
+
+
+def revoke(claims):
+    """Reject the token with these claims from now until it expires."""
+    expires_at = datetime.fromtimestamp(claims["exp"], tz=timezone.utc)
+    RevokedToken.objects.get_or_create(
+        jti=claims[api_settings.JTI_CLAIM], defaults={"expires_at": expires_at}
+    )
+
+
+def purge_revoked_tokens(now=None):
+    """Delete revocations of tokens that have expired anyway."""
+    deleted, _ = RevokedToken.objects.filter(
+        expires_at__lte=now or datetime.now(timezone.utc)
+    ).delete()
+    return deleted
@@ -0,0 +1,52 @@
+import logging
+
+from django.conf import settings
+from django.core.mail import send_mail
+
+from jobs.queue import job
+
+from .avatars import generate_thumbnails
+from .models import User
+
+audit_logger = logging.getLogger("plms.audit")
+analytics_logger = logging.getLogger("plms.analytics")
+
+
+@job()
+def send_welcome_email(user_id):
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        return
+    send_mail(
+        "Chào mừng đến với PLMS",
+        f"Xin chào {user.first_name or user.username}, tài khoản của bạn đã sẵn sàng.",
+        settings.DEFAULT_FROM_EMAIL,
+        [user.email],
+    )
+
+
+@job()
+def record_signup_audit(user_id, username):
+    audit_logger.info("signup user_id=%s username=%s", user_id, username)
+
+
+@job()
+def track_signup(user_id, ab_group):
+    analytics_logger.info("event=signup user_id=%s ab_group=%s", user_id, ab_group)
+
+
+@job()
+def generate_avatar_thumbnails(digest):
+    generate_thumbnails(digest)
+
+
+def enqueue_avatar_thumbnails(digest):
+    # One job per image however many requests hit the missing thumbnail.
+    generate_avatar_thumbnails.delay(digest, idempotency_key=f"thumbnails:{digest}")
+
+
+def enqueue_signup_side_effects(user):
+    key = f"signup:{user.pk}"
+    send_welcome_email.delay(user.pk, idempotency_key=f"{key}:welcome")
+    record_signup_audit.delay(user.pk, user.username, idempotency_key=f"{key}:audit")
+    track_signup.delay(user.pk, user.ab_group, idempotency_key=f"{key}:analytics")
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users.changes import compact_changes
+
+
+class Command(BaseCommand):
+    help = "Drop superseded user change feed entries older than the retention window."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.USERS_CHANGES_RETENTION_DAYS,
+            help="Only compact entries older than this many days.",
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options["days"])
+        deleted = compact_changes(before)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} change entries."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from users.introspection import purge_revoked_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete revoked-token entries whose tokens have expired."
+
+    def handle(self, *args, **options):
+        deleted = purge_revoked_tokens()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} revoked tokens."))
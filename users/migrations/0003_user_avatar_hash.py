@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_user_change"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="avatar_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_user_avatar_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RolePermissionOverride",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "role",
+                    models.CharField(
+                        choices=[
+                            ("admin", "Admin"),
+                            ("teacher", "Teacher"),
+                            ("student", "Student"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                (
+                    "permission",
+                    models.CharField(
+                        choices=[
+                            ("users.view_profiles", "users.view_profiles"),
+                            ("users.view_changes", "users.view_changes"),
+                            ("users.manage_users", "users.manage_users"),
+                            ("courses.view", "courses.view"),
+                            ("courses.enroll", "courses.enroll"),
+                            ("courses.edit", "courses.edit"),
+                            ("grades.view_own", "grades.view_own"),
+                            ("grades.view_all", "grades.view_all"),
+                            ("grades.edit", "grades.edit"),
+                        ],
+                        max_length=64,
+                    ),
+                ),
+                ("granted", models.BooleanField(default=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("role", "permission"), name="unique_role_permission"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-19 17:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0004_role_permission_override"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="ab_group",
+            field=models.CharField(db_index=True, default="CTRL", max_length=8),
+        ),
+        migrations.AlterField(
+            model_name="user",
+            name="locale",
+            field=models.CharField(db_index=True, default="vi", max_length=5),
+        ),
+        migrations.AlterField(
+            model_name="user",
+            name="role",
+            field=models.CharField(
+                choices=[
+                    ("admin", "Admin"),
+                    ("teacher", "Teacher"),
+                    ("student", "Student"),
+                ],
+                db_index=True,
+                default="student",
+                max_length=16,
+            ),
+        ),
+    ]
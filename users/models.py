@@ -1,15 +1,91 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+
+from .roles import PERMISSIONS
 
 
 class User(AbstractUser):
     ROLE_CHOICES = (("admin", "Admin"), ("teacher", "Teacher"), ("student", "Student"))
 
-    role = models.CharField(max_length=16, choices=ROLE_CHOICES, default="student")
-    locale = models.CharField(max_length=5, default="vi")
+    # Indexed for the admin list filters.
+    role = models.CharField(
+        max_length=16, choices=ROLE_CHOICES, default="student", db_index=True
+    )
+    locale = models.CharField(max_length=5, default="vi", db_index=True)
     avatar = models.URLField(blank=True, null=True)
-    ab_group = models.CharField(max_length=8, default="CTRL")
+    # sha256 of an uploaded avatar; thumbnails are stored under this digest.
+    avatar_hash = models.CharField(max_length=64, blank=True, default="")
+    ab_group = models.CharField(max_length=8, default="CTRL", db_index=True)
     email = models.EmailField(unique=True)
+    # Embedded in issued JWTs; bumping it revokes every outstanding token.
+    token_version = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"{self.username} ({self.role})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so the change feed can tell deactivations from updates
+        # without re-reading the row.
+        instance._loaded_is_active = instance.__dict__.get("is_active")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # post_save receivers (e.g. the change feed) write in this transaction.
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+        self._loaded_is_active = self.is_active
+
+
+class RolePermissionOverride(models.Model):
+    """Grant or revoke one permission for a role on top of ``roles.ROLE_PERMISSIONS``."""
+
+    role = models.CharField(max_length=16, choices=User.ROLE_CHOICES)
+    permission = models.CharField(
+        max_length=64, choices=[(name, name) for name in PERMISSIONS]
+    )
+    granted = models.BooleanField(default=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["role", "permission"], name="unique_role_permission"
+            )
+        ]
+
+    def __str__(self):
+        verb = "grant" if self.granted else "revoke"
+        return f"{verb} {self.permission} for {self.role}"
+
+
+class UserChange(models.Model):
+    ACTION_CHOICES = (
+        ("insert", "Insert"),
+        ("update", "Update"),
+        ("deactivate", "Deactivate"),
+        ("delete", "Delete"),
+    )
+
+    # Plain id rather than a foreign key so entries outlive deleted users.
+    user_id = models.BigIntegerField(db_index=True)
+    action = models.CharField(max_length=16, choices=ACTION_CHOICES)
+    data = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"#{self.pk} {self.action} user={self.user_id}"
+
+
+class RevokedToken(models.Model):
+    """A single JWT (by ``jti``) rejected before it expires; see ``is_revoked``."""
+
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.jti
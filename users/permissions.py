@@ -0,0 +1,25 @@
+from rest_framework import permissions
+
+from .roles import has_mask, mask_for
+
+
+class RolePermission(permissions.BasePermission):
+    """
+    Allow authenticated users whose role grants every permission in
+    ``required``. Build subclasses with ``role_permission()``.
+    """
+
+    required = ()
+    mask = 0
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and has_mask(user, self.mask))
+
+
+def role_permission(*names):
+    return type(
+        "RolePermission",
+        (RolePermission,),
+        {"required": names, "mask": mask_for(*names)},
+    )
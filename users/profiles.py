@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import User
+from .serializers import UserSummarySerializer
+
+PROFILE_KEY = "users:profile:{}"
+USERNAME_KEY = "users:username:{}"
+PROFILE_COLUMNS = [
+    "id",
+    "username",
+    "first_name",
+    "last_name",
+    "avatar",
+    "avatar_hash",
+    "role",
+]
+
+
+def profile_key(user_id):
+    return PROFILE_KEY.format(user_id)
+
+
+def username_key(username):
+    return USERNAME_KEY.format(username)
+
+
+def invalidate_profiles(user_ids):
+    cache.delete_many([profile_key(pk) for pk in user_ids])
+
+
+def resolve_profiles(ids=(), usernames=()):
+    """
+    Resolve display profiles for ``ids`` and ``usernames``.
+
+    Cached profiles are served with one ``get_many`` round trip and all misses
+    are loaded with a single ``IN`` query. Returns ``(profiles, missing)`` where
+    ``profiles`` maps user id to profile data.
+    """
+    ids = list(dict.fromkeys(ids))
+    usernames = list(dict.fromkeys(usernames))
+
+    # username -> id is effectively stable; a stale mapping is caught below by
+    # comparing the cached profile's username with the requested one.
+    known_ids = cache.get_many([username_key(name) for name in usernames])
+    name_to_id = {
+        name: known_ids[username_key(name)]
+        for name in usernames
+        if username_key(name) in known_ids
+    }
+
+    wanted = set(ids) | set(name_to_id.values())
+    cached = cache.get_many([profile_key(pk) for pk in wanted])
+    profiles = {}
+    for pk in wanted:
+        data = cached.get(profile_key(pk))
+        if data is not None:
+            profiles[pk] = data
+
+    by_username = {data["username"]: pk for pk, data in profiles.items()}
+    missing_ids = [pk for pk in ids if pk not in profiles]
+    missing_names = [name for name in usernames if name not in by_username]
+
+    if missing_ids or missing_names:
+        users = User.objects.filter(
+            Q(pk__in=missing_ids) | Q(username__in=missing_names)
+        ).only(*PROFILE_COLUMNS)
+        fresh = {user.pk: UserSummarySerializer(user).data for user in users}
+        timeout = settings.USERS_PROFILE_CACHE_TIMEOUT
+        cache.set_many({profile_key(pk): data for pk, data in fresh.items()}, timeout)
+        cache.set_many(
+            {username_key(data["username"]): pk for pk, data in fresh.items()},
+            timeout,
+        )
+        profiles.update(fresh)
+        by_username.update({data["username"]: pk for pk, data in fresh.items()})
+
+    requested_ids, requested_names = set(ids), set(usernames)
+    profiles = {
+        pk: data
+        for pk, data in profiles.items()
+        if pk in requested_ids or data["username"] in requested_names
+    }
+    missing = [pk for pk in ids if pk not in profiles]
+    missing += [name for name in usernames if name not in by_username]
+    return profiles, missing
@@ -0,0 +1,121 @@
+"""
+Role based permissions compiled to integer bitsets.
+
+``ROLE_PERMISSIONS`` is the declarative source of truth. It is compiled into a
+``{role: bits}`` table once at startup so a check is a dict lookup and a bitwise
+AND. Admin-edited ``RolePermissionOverride`` rows are folded in lazily; the
+merged table lives in the cache and is dropped once an override change commits.
+"""
+
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+
+PERMISSIONS = (
+    "users.view_profiles",
+    "users.view_changes",
+    "users.manage_users",
+    "courses.view",
+    "courses.enroll",
+    "courses.edit",
+    "grades.view_own",
+    "grades.view_all",
+    "grades.edit",
+)
+
+ROLE_PERMISSIONS = {
+    "admin": PERMISSIONS,
+    "teacher": (
+        "users.view_profiles",
+        "courses.view",
+        "courses.edit",
+        "grades.view_all",
+        "grades.edit",
+    ),
+    "student": (
+        "users.view_profiles",
+        "courses.view",
+        "courses.enroll",
+        "grades.view_own",
+    ),
+}
+
+BITS = {name: 1 << index for index, name in enumerate(PERMISSIONS)}
+ALL_BITS = (1 << len(PERMISSIONS)) - 1
+
+TABLE_KEY = "users:roles:table"
+
+_local = {"table": None, "checked": 0.0}
+
+
+@lru_cache(maxsize=None)
+def mask_for(*names):
+    mask = 0
+    for name in names:
+        try:
+            mask |= BITS[name]
+        except KeyError:
+            raise ValueError(f"Unknown permission {name!r}") from None
+    return mask
+
+
+# Compiled when the app registry imports this module.
+BASE_TABLE = {role: mask_for(*names) for role, names in ROLE_PERMISSIONS.items()}
+
+
+def compile_table(overrides=()):
+    """Apply ``(role, permission, granted)`` overrides on top of ``BASE_TABLE``."""
+    table = dict(BASE_TABLE)
+    for role, name, granted in overrides:
+        if name not in BITS:
+            continue
+        if granted:
+            table[role] = table.get(role, 0) | BITS[name]
+        else:
+            table[role] = table.get(role, 0) & ~BITS[name]
+    return table
+
+
+def role_table():
+    now = time.monotonic()
+    if (
+        _local["table"] is None
+        or now - _local["checked"] > settings.ROLE_PERMISSIONS_RECHECK
+    ):
+        table = cache.get(TABLE_KEY)
+        if table is None:
+            from .models import RolePermissionOverride
+
+            table = compile_table(
+                RolePermissionOverride.objects.values_list(
+                    "role", "permission", "granted"
+                )
+            )
+            # Finite so a table rebuilt from rows read just before an
+            # override commits can't outlive ROLE_PERMISSIONS_CACHE_TIMEOUT.
+            cache.set(TABLE_KEY, table, settings.ROLE_PERMISSIONS_CACHE_TIMEOUT)
+        _local.update(table=table, checked=now)
+    return _local["table"]
+
+
+def invalidate_role_table():
+    cache.delete(TABLE_KEY)
+    _local["table"] = None
+
+
+def role_bits(role):
+    return role_table().get(role, 0)
+
+
+def has_mask(user, mask):
+    if not user.is_active:
+        return False
+    if user.is_superuser:
+        return True
+    return role_bits(user.role) & mask == mask
+
+
+def has_role_perm(user, *names):
+    return has_mask(user, mask_for(*names))
@@ -1,10 +1,28 @@
+from django.conf import settings
 from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
 
-from .models import User
+from .avatars import original_url, thumbnail_urls
+from .introspection import is_revoked
+from .models import User, UserChange
 
 
-class UserSerializer(serializers.ModelSerializer):
+class AvatarFieldsMixin(serializers.Serializer):
+    avatar = serializers.SerializerMethodField()
+    avatar_thumbnails = serializers.SerializerMethodField()
+
+    def get_avatar(self, obj):
+        # An uploaded image wins over an external ``avatar`` URL.
+        return original_url(obj.avatar_hash) if obj.avatar_hash else obj.avatar
+
+    def get_avatar_thumbnails(self, obj):
+        return thumbnail_urls(obj.avatar_hash) if obj.avatar_hash else None
+
+
+class UserSerializer(AvatarFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = [
@@ -16,10 +34,97 @@ class UserSerializer(serializers.ModelSerializer):
             "role",
             "locale",
             "avatar",
+            "avatar_thumbnails",
             "ab_group",
         ]
 
 
+class UserSummarySerializer(AvatarFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = [
+            "id",
+            "username",
+            "first_name",
+            "last_name",
+            "avatar",
+            "avatar_thumbnails",
+            "role",
+        ]
+
+
+class UserBatchSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, default=list
+    )
+    usernames = serializers.ListField(
+        child=serializers.CharField(max_length=150), required=False, default=list
+    )
+
+    def validate(self, attrs):
+        size = len(attrs["ids"]) + len(attrs["usernames"])
+        if not size:
+            raise serializers.ValidationError("Provide at least one id or username.")
+        if size > settings.USERS_BATCH_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"At most {settings.USERS_BATCH_MAX_SIZE} ids and usernames per request."
+            )
+        return attrs
+
+
+class UserChangeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UserChange
+        fields = ["id", "user_id", "action", "data", "created_at"]
+
+
+class UserChangesQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0, required=False, default=0)
+    limit = serializers.IntegerField(min_value=1, required=False)
+
+    def validate_limit(self, value):
+        return min(value, settings.USERS_CHANGES_BATCH_SIZE)
+
+    def validate(self, attrs):
+        attrs.setdefault("limit", settings.USERS_CHANGES_BATCH_SIZE)
+        return attrs
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        # Checked by token introspection; see User.token_version.
+        token["token_version"] = user.token_version
+        return token
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = User.objects.filter(pk=refresh.get(api_settings.USER_ID_CLAIM)).first()
+        if user is not None and is_revoked(refresh, user):
+            raise InvalidToken("Token has been revoked.")
+        return super().validate(attrs)
+
+
+class RevokeTokenSerializer(serializers.Serializer):
+    token = serializers.CharField(max_length=4096)
+
+
+class IntrospectSerializer(serializers.Serializer):
+    tokens = serializers.ListField(
+        child=serializers.CharField(max_length=4096), allow_empty=False
+    )
+
+    def validate_tokens(self, value):
+        if len(value) > settings.INTROSPECTION_MAX_TOKENS:
+            raise serializers.ValidationError(
+                f"At most {settings.INTROSPECTION_MAX_TOKENS} tokens per request."
+            )
+        return value
+
+
 class SignupSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
 
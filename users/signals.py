@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .changes import IGNORED_FIELDS, record_change
+from .models import RolePermissionOverride, User
+from .profiles import invalidate_profiles
+from .roles import invalidate_role_table
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_profile(sender, instance, **kwargs):
+    # After commit, so a concurrent reader can't re-cache the old row.
+    pk = instance.pk
+    transaction.on_commit(lambda: invalidate_profiles([pk]))
+
+
+@receiver(post_save, sender=User)
+def log_user_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        record_change(instance, "insert")
+        return
+    if update_fields is not None and set(update_fields) <= IGNORED_FIELDS:
+        return
+    was_active = getattr(instance, "_loaded_is_active", None)
+    if was_active and not instance.is_active:
+        record_change(instance, "deactivate")
+    else:
+        record_change(instance, "update")
+
+
+@receiver(post_delete, sender=User)
+def log_user_deleted(sender, instance, **kwargs):
+    record_change(instance, "delete")
+
+
+@receiver(post_save, sender=RolePermissionOverride)
+@receiver(post_delete, sender=RolePermissionOverride)
+def drop_role_table(sender, **kwargs):
+    transaction.on_commit(invalidate_role_table)
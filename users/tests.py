@@ -1,3 +1,638 @@
-from django.test import TestCase
+import contextlib
+import io
+import json
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib import admin
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import AccessToken
+
+from jobs import queue
+
+from . import introspection
+from .admin import EstimatedCountPaginator, UserAdmin
+from .changes import compact_changes
+from .idempotency import IdempotentMixin
+from .idempotency import store as idempotency_store
+from .jobs import generate_avatar_thumbnails
+from .models import RevokedToken, RolePermissionOverride, User, UserChange
+from .permissions import role_permission
+from .profiles import resolve_profiles
+from .roles import has_role_perm, invalidate_role_table
+
+
+class UserBatchAPITests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.caller = User.objects.create_user(
+            "service", email="service@example.com", password="x", is_staff=True
+        )
+        self.client.force_authenticate(self.caller)
+        self.users = [
+            User.objects.create_user(f"u{i}", email=f"u{i}@example.com", role="teacher")
+            for i in range(3)
+        ]
+
+    def post(self, data):
+        return self.client.post("/api/users/batch/", data, format="json")
+
+    def test_resolves_ids_and_usernames_into_id_keyed_map(self):
+        a, b, c = self.users
+        response = self.post(
+            {"ids": [a.pk, 999999], "usernames": [b.username, "nobody"]}
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(set(body["results"]), {str(a.pk), str(b.pk)})
+        self.assertEqual(body["results"][str(b.pk)]["role"], "teacher")
+        self.assertNotIn("email", body["results"][str(a.pk)])
+        self.assertEqual(body["missing"], [999999, "nobody"])
+
+    def test_second_lookup_is_served_from_cache(self):
+        ids = [user.pk for user in self.users]
+        with self.assertNumQueries(1):
+            self.post({"ids": ids})
+        with self.assertNumQueries(0):
+            response = self.post({"ids": ids})
+        self.assertEqual(len(response.json()["results"]), 3)
+
+    def test_save_invalidates_cached_profile(self):
+        user = self.users[0]
+        self.post({"ids": [user.pk]})
+        user.first_name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            user.save()
+            # Not before commit, or a concurrent lookup could re-cache it.
+            self.assertIsNotNone(cache.get(f"users:profile:{user.pk}"))
+        self.assertTrue(callbacks)
+        response = self.post({"ids": [user.pk]})
+        self.assertEqual(
+            response.json()["results"][str(user.pk)]["first_name"], "Renamed"
+        )
+
+    def test_requires_staff_or_user_managers(self):
+        teacher, manager = self.users[:2]
+        manager.role = "admin"
+        self.client.force_authenticate(teacher)
+        self.assertEqual(self.post({"ids": [1]}).status_code, 403)
+        self.client.force_authenticate(manager)
+        self.assertEqual(self.post({"ids": [1]}).status_code, 200)
+
+    def test_rejects_oversized_batch(self):
+        with self.settings(USERS_BATCH_MAX_SIZE=2):
+            response = self.post({"ids": [1, 2, 3]})
+        self.assertEqual(response.status_code, 400)
+
+
+class UserChangesAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User(pk=0, username="sync", is_staff=True, is_active=True)
+        )
+
+    def get(self, **params):
+        return self.client.get("/api/users/changes/", params)
+
+    def test_records_insert_update_and_deactivate(self):
+        user = User.objects.create_user("alice", email="alice@example.com")
+        user.locale = "en"
+        user.save()
+        user = User.objects.get(pk=user.pk)
+        user.is_active = False
+        user.save()
+        user.save(update_fields=["last_login"])
+
+        body = self.get(since=0).json()
+        self.assertEqual(
+            [change["action"] for change in body["results"]],
+            ["insert", "update", "deactivate"],
+        )
+        self.assertEqual(body["results"][1]["data"]["locale"], "en")
+        self.assertFalse(body["has_more"])
+
+    def test_cursor_pages_in_order(self):
+        for i in range(5):
+            User.objects.create_user(f"u{i}", email=f"u{i}@example.com")
+        first = self.get(since=0, limit=3).json()
+        self.assertTrue(first["has_more"])
+        second = self.get(since=first["next"], limit=3).json()
+        ids = [c["id"] for c in first["results"] + second["results"]]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), 5)
+        self.assertFalse(second["has_more"])
+
+    def test_recent_changes_wait_for_commit_lag(self):
+        User.objects.create_user("old", email="old@example.com")
+        UserChange.objects.update(created_at=timezone.now() - timedelta(minutes=1))
+        User.objects.create_user("new", email="new@example.com")
+        with mock.patch("users.changes.commit_lag", return_value=5):
+            body = self.get(since=0).json()
+        self.assertEqual([c["data"]["username"] for c in body["results"]], ["old"])
+        self.assertTrue(body["has_more"])
+        self.assertEqual(body["next"], body["results"][0]["id"])
+
+    def test_requires_staff_or_change_viewers(self):
+        self.client.force_authenticate(User(pk=0, username="x", is_active=True))
+        self.assertEqual(self.get().status_code, 403)
+        self.client.force_authenticate(
+            User(pk=0, username="sync", role="admin", is_active=True)
+        )
+        self.assertEqual(self.get().status_code, 200)
+
+    def test_compaction_keeps_latest_entry_per_user(self):
+        user = User.objects.create_user("bob", email="bob@example.com")
+        user.first_name = "Bob"
+        user.save()
+        UserChange.objects.update(created_at=timezone.now() - timedelta(days=60))
+        user.last_name = "B"
+        user.save()
+
+        self.assertEqual(compact_changes(timezone.now() - timedelta(days=30)), 2)
+        self.assertEqual(
+            list(UserChange.objects.values_list("action", flat=True)), ["update"]
+        )
+
+
+def png_bytes(size=(300, 200), color="red"):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class AvatarUploadTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client = APIClient()
+        self.user = User.objects.create_user("pic", email="pic@example.com")
+        self.client.force_authenticate(self.user)
+
+    def upload(self, content, name="a.png"):
+        return self.client.put(
+            "/api/auth/me/avatar/",
+            {"file": SimpleUploadedFile(name, content)},
+            format="multipart",
+        )
+
+    def test_upload_is_content_addressed_and_deduplicated(self):
+        content = png_bytes()
+        with self.captureOnCommitCallbacks():
+            first = self.upload(content).json()
+            second = self.upload(content, name="other.png").json()
+        self.assertEqual(first["avatar"], second["avatar"])
+        self.assertTrue(first["avatar"].endswith("/original"))
+        self.assertEqual(self.client.get(first["avatar"])["Content-Type"], "image/png")
+        # The stored external-URL field is left alone, so the model validates.
+        User.objects.get(pk=self.user.pk).clean_fields()
+        self.assertEqual(set(first["avatar_thumbnails"]), {"64", "128", "256"})
+
+        digest = User.objects.get(pk=self.user.pk).avatar_hash
+        stored = [p for p in Path(self.media_root).rglob("*") if p.is_file()]
+        self.assertEqual([p.name for p in stored], ["original.png"])
+        self.assertIn(digest, str(stored[0]))
+
+    def test_thumbnails_are_served_immutable(self):
+        with self.captureOnCommitCallbacks():
+            body = self.upload(png_bytes()).json()
+        url = body["avatar_thumbnails"]["64"]
+
+        # Thumbnails are never generated in-process here, as if the worker
+        # died; the fallback response queues them instead.
+        with self.captureOnCommitCallbacks(execute=True):
+            pending = self.client.get(url)
+            self.client.get(url)
+        self.assertEqual(pending["Content-Type"], "image/png")
+        self.assertNotIn("immutable", pending["Cache-Control"])
+
+        queued = queue.connect().execute(
+            "SELECT COUNT(*) FROM jobs WHERE name = ? AND state = ?",
+            (generate_avatar_thumbnails.job_name, queue.QUEUED),
+        )
+        self.assertEqual(queued.fetchone()[0], 1)
+        queue.run_pending()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/webp")
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_rejects_non_images_and_oversized_uploads(self):
+        self.assertEqual(self.upload(b"not an image").status_code, 400)
+        with self.settings(AVATAR_MAX_UPLOAD_SIZE=100):
+            self.assertEqual(self.upload(png_bytes()).status_code, 413)
+
+
+class RolePermissionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_role_table()
+        self.teacher = User(username="t", role="teacher", is_active=True)
+        self.student = User(username="s", role="student", is_active=True)
+
+    def test_declarative_table(self):
+        self.assertTrue(has_role_perm(self.teacher, "courses.edit", "grades.edit"))
+        self.assertFalse(has_role_perm(self.student, "courses.edit"))
+        self.assertTrue(has_role_perm(self.student, "courses.view", "courses.enroll"))
+        self.student.is_active = False
+        self.assertFalse(has_role_perm(self.student, "courses.view"))
+
+    def test_overrides_apply_and_invalidate(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            RolePermissionOverride.objects.create(
+                role="student", permission="courses.edit", granted=True
+            )
+        self.assertTrue(has_role_perm(self.student, "courses.edit"))
+        with self.captureOnCommitCallbacks(execute=True):
+            override = RolePermissionOverride.objects.create(
+                role="teacher", permission="grades.edit", granted=False
+            )
+        self.assertFalse(has_role_perm(self.teacher, "grades.edit"))
+        with self.captureOnCommitCallbacks(execute=True):
+            override.delete()
+        self.assertTrue(has_role_perm(self.teacher, "grades.edit"))
+
+    def test_drf_permission_checks_without_queries(self):
+        permission = role_permission("courses.edit")()
+        request = APIRequestFactory().get("/")
+        has_role_perm(self.teacher, "courses.view")
+        with self.assertNumQueries(0):
+            request.user = self.teacher
+            self.assertTrue(permission.has_permission(request, None))
+            request.user = self.student
+            self.assertFalse(permission.has_permission(request, None))
+
+    def test_unknown_permission_is_rejected(self):
+        with self.assertRaises(ValueError):
+            role_permission("courses.fly")
+
+
+class SignupAPITests(TransactionTestCase):
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        override = override_settings(JOBS_DATABASE=Path(tmp) / "jobs.sqlite3")
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_signup_enqueues_side_effects(self):
+        response = APIClient().post(
+            "/api/auth/signup/",
+            {
+                "username": "newbie",
+                "email": "newbie@example.com",
+                "password": "TestPass123!",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(queue.metrics()["depth"]["queued"], 3)
+        self.assertEqual(queue.run_pending(), 3)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["newbie@example.com"])
+
+
+class SlowCounterAPI(IdempotentMixin, APIView):
+    authentication_classes = []
+    permission_classes = []
+    calls = 0
+
+    def post(self, request):
+        type(self).calls += 1
+        time.sleep(0.2)
+        return Response({"call": type(self).calls}, status=201)
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        idempotency_store.clear()
+        self.client = APIClient()
+        SlowCounterAPI.calls = 0
+
+    def signup(self, key, **overrides):
+        data = {
+            "username": "retry",
+            "email": "retry@example.com",
+            "password": "TestPass123!",
+            **overrides,
+        }
+        return self.client.post(
+            "/api/auth/signup/", data, format="json", HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_signup_retry_replays_first_response(self):
+        with self.captureOnCommitCallbacks():
+            first = self.signup("abc")
+            retry = self.signup("abc")
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(User.objects.filter(username="retry").count(), 1)
+
+    def test_key_reused_with_different_body_is_rejected(self):
+        with self.captureOnCommitCallbacks():
+            self.signup("abc")
+        self.assertEqual(self.signup("abc", username="other").status_code, 422)
+
+    def test_token_retry_replays_tokens(self):
+        User.objects.create_user(
+            "tok", email="tok@example.com", password="TestPass123!"
+        )
+        data = {"username": "tok", "password": "TestPass123!"}
+        first = self.client.post(
+            "/api/auth/token/", data, format="json", HTTP_IDEMPOTENCY_KEY="t1"
+        )
+        retry = self.client.post(
+            "/api/auth/token/", data, format="json", HTTP_IDEMPOTENCY_KEY="t1"
+        )
+        self.assertEqual(retry.json()["access"], first.json()["access"])
+
+    def test_token_responses_are_replayed_briefly(self):
+        User.objects.create_user(
+            "tok", email="tok@example.com", password="TestPass123!"
+        )
+        data = {"username": "tok", "password": "TestPass123!"}
+        responses = []
+        for now in (1000.0, 1000.0 + settings.IDEMPOTENCY_TOKEN_TTL + 1):
+            with mock.patch("users.idempotency.time.monotonic", return_value=now):
+                responses.append(
+                    self.client.post(
+                        "/api/auth/token/",
+                        data,
+                        format="json",
+                        HTTP_IDEMPOTENCY_KEY="t1",
+                    )
+                )
+        first, late = responses
+        self.assertEqual(late.status_code, 200)
+        self.assertNotIn("Idempotent-Replayed", late)
+        self.assertNotEqual(late.json()["access"], first.json()["access"])
+
+    def test_concurrent_duplicates_share_one_execution(self):
+        view = SlowCounterAPI.as_view()
+        factory = APIRequestFactory()
+        results = []
+
+        def call():
+            request = factory.post(
+                "/slow/", {}, format="json", HTTP_IDEMPOTENCY_KEY="k"
+            )
+            results.append(view(request))
+
+        threads = [threading.Thread(target=call) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(SlowCounterAPI.calls, 1)
+        self.assertEqual({r.status_code for r in results}, {201})
+
+
+class UserAdminTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(
+            "root", email="root@example.com", password="x"
+        )
+        self.client.force_login(self.admin)
+        self.alice = User.objects.create_user("alice", email="alice@example.com")
+        self.malice = User.objects.create_user("malice", email="m@example.com")
+
+    def changelist(self, **params):
+        response = self.client.get("/admin/users/user/", params)
+        self.assertEqual(response.status_code, 200)
+        return list(response.context["cl"].result_list)
+
+    def test_search_matches_prefix_or_id(self):
+        self.assertEqual(self.changelist(q="ali"), [self.alice])
+        self.assertEqual(self.changelist(q=str(self.malice.pk)), [self.malice])
+        self.assertEqual(
+            self.changelist(role="student"), [self.malice, self.alice, self.admin]
+        )
+
+    def test_add_view_requires_unique_email(self):
+        def add(username, email):
+            return self.client.post(
+                "/admin/users/user/add/",
+                {
+                    "username": username,
+                    "email": email,
+                    "usable_password": "true",
+                    "password1": "c0rrect-h0rse",
+                    "password2": "c0rrect-h0rse",
+                },
+            )
+
+        self.assertEqual(add("bob", "bob@example.com").status_code, 302)
+        self.assertEqual(add("carol", "carol@example.com").status_code, 302)
+        self.assertEqual(User.objects.get(username="carol").email, "carol@example.com")
+        self.assertEqual(add("dave", "").status_code, 200)
+        self.assertEqual(add("dave", "bob@example.com").status_code, 200)
+        self.assertFalse(User.objects.filter(username="dave").exists())
+
+    def test_search_uses_indexes(self):
+        queryset, _ = admin.site._registry[User].get_search_results(
+            None, User.objects.all(), "ali"
+        )
+        plan = queryset.explain()
+        self.assertNotIn("SCAN", plan)
+        self.assertIn("SEARCH", plan)
+
+    def test_deep_pages_stay_reachable(self):
+        for i in range(30):
+            User.objects.create_user(f"bulk{i}", email=f"bulk{i}@example.com")
+        with mock.patch.object(UserAdmin, "list_per_page", 2), mock.patch.object(
+            EstimatedCountPaginator, "lookahead_pages", 1
+        ):
+            first = self.client.get("/admin/users/user/", {"role": "student"})
+            self.assertTrue(first.context["cl"].paginator.is_estimate)
+            self.assertContains(first, "~5 ")
+            self.assertContains(first, "about 5")
+            deep = self.client.get("/admin/users/user/", {"role": "student", "p": 16})
+        self.assertEqual(deep.status_code, 200)
+        self.assertEqual(deep.context["cl"].result_count, 33)
+        self.assertFalse(deep.context["cl"].paginator.is_estimate)
+
+    def test_bulk_role_change_updates_logs_and_invalidates(self):
+        ids = [self.alice.pk, self.malice.pk]
+        resolve_profiles(ids, [])
+        UserChange.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                "/admin/users/user/",
+                {"action": "set_role", "_selected_action": ids, "role": "teacher"},
+            )
+        self.assertEqual(
+            set(User.objects.filter(pk__in=ids).values_list("role", flat=True)),
+            {"teacher"},
+        )
+        self.assertEqual(UserChange.objects.filter(action="update").count(), 2)
+        self.assertEqual(cache.get_many([f"users:profile:{pk}" for pk in ids]), {})
+
+    def test_bulk_action_across_all_pages_updates_in_batches(self):
+        with mock.patch("users.admin.UPDATE_BATCH_SIZE", 1):
+            self.client.post(
+                "/admin/users/user/?role=student",
+                {
+                    "action": "set_ab_group",
+                    "select_across": "1",
+                    "_selected_action": [self.alice.pk],
+                    "ab_group": "B2",
+                },
+            )
+        self.assertEqual(set(User.objects.values_list("ab_group", flat=True)), {"B2"})
+
+
+class IntrospectionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User(pk=0, username="gateway", is_staff=True, is_active=True)
+        )
+        self.user = User.objects.create_user(
+            "jwt", email="jwt@example.com", password="TestPass123!"
+        )
+        self.tokens = (
+            APIClient()
+            .post(
+                "/api/auth/token/",
+                {"username": "jwt", "password": "TestPass123!"},
+                format="json",
+            )
+            .json()
+        )
+
+    def introspect(self, *tokens):
+        response = self.client.post(
+            "/api/auth/introspect/", {"tokens": list(tokens)}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        return [result["active"] for result in response.json()["results"]]
+
+    def test_only_live_access_tokens_are_active(self):
+        response = self.client.post(
+            "/api/auth/introspect/",
+            {"tokens": [self.tokens["access"], self.tokens["refresh"], "x.y.z"]},
+            format="json",
+        )
+        first, refresh, garbage = response.json()["results"]
+        self.assertTrue(first["active"])
+        self.assertEqual(first["user_id"], str(self.user.pk))
+        self.assertEqual(first["token_version"], 0)
+        self.assertEqual(refresh, {"active": False})
+        self.assertEqual(garbage, {"active": False})
+
+    def test_signatures_are_verified_once(self):
+        access = self.tokens["access"]
+        self.introspect(access, "x.y.z")
+        with mock.patch.object(
+            introspection, "verify", side_effect=AssertionError
+        ), self.assertNumQueries(2):
+            self.assertEqual(
+                self.introspect(access, access, "x.y.z"), [True, True, False]
+            )
+
+    def test_cold_batch_is_cached_in_one_write(self):
+        tokens = []
+        for seconds in range(1, 6):
+            token = AccessToken.for_user(self.user)
+            token.set_exp(lifetime=timedelta(minutes=seconds))
+            tokens.append(str(token))
+        with mock.patch.object(cache, "set_many", wraps=cache.set_many) as set_many:
+            self.assertEqual(self.introspect(*tokens, "x.y.z"), [True] * 5 + [False])
+        self.assertEqual(set_many.call_count, 2)
+        self.assertAlmostEqual(set_many.call_args_list[0].args[1], 300, delta=5)
+
+    def test_revocation_and_token_version_apply_immediately(self):
+        access = self.tokens["access"]
+        self.assertEqual(self.introspect(access), [True])
+        User.objects.filter(pk=self.user.pk).update(token_version=1)
+        self.assertEqual(self.introspect(access), [False])
+
+        User.objects.filter(pk=self.user.pk).update(token_version=0)
+        introspection.revoke(introspection.verify(access))
+        self.assertEqual(RevokedToken.objects.count(), 1)
+        self.assertEqual(self.introspect(access), [False])
+
+    def test_api_authentication_honours_revocation(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+        self.assertEqual(client.get("/api/auth/me/").status_code, 200)
+        User.objects.filter(pk=self.user.pk).update(token_version=1)
+        self.assertEqual(client.get("/api/auth/me/").status_code, 401)
+
+        User.objects.filter(pk=self.user.pk).update(token_version=0)
+        introspection.revoke(introspection.verify(self.tokens["access"]))
+        self.assertEqual(client.get("/api/auth/me/").status_code, 401)
+
+    def test_users_revoke_their_own_tokens(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+        refresh = {"refresh": self.tokens["refresh"]}
+        self.assertEqual(
+            client.post("/api/auth/token/refresh/", refresh).status_code, 200
+        )
+
+        def revoke(token):
+            return client.post("/api/auth/token/revoke/", {"token": token})
+
+        self.assertEqual(revoke(self.tokens["refresh"]).status_code, 204)
+        self.assertEqual(
+            client.post("/api/auth/token/refresh/", refresh).status_code, 401
+        )
+
+        other = User.objects.create_user("other", email="other@example.com")
+        self.assertEqual(revoke(str(AccessToken.for_user(other))).status_code, 403)
+        self.assertEqual(revoke("x.y.z").status_code, 400)
+
+        self.assertEqual(revoke(self.tokens["access"]).status_code, 204)
+        self.assertEqual(client.get("/api/auth/me/").status_code, 401)
+
+    def test_schema_documents_bearer_auth(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            response = self.client.get("/api/schema/", HTTP_ACCEPT="application/json")
+        schema = json.loads(response.content)
+        self.assertIn("jwtAuth", schema["components"]["securitySchemes"])
+
+    def test_expired_revocations_are_purged(self):
+        now = timezone.now()
+        RevokedToken.objects.create(jti="old", expires_at=now - timedelta(hours=1))
+        RevokedToken.objects.create(jti="live", expires_at=now + timedelta(hours=1))
+        call_command("purge_revoked_tokens", stdout=io.StringIO())
+        self.assertEqual(
+            list(RevokedToken.objects.values_list("jti", flat=True)), ["live"]
+        )
+
+    def test_requires_staff_and_bounded_batches(self):
+        with self.settings(INTROSPECTION_MAX_TOKENS=1):
+            response = self.client.post(
+                "/api/auth/introspect/", {"tokens": ["a", "b"]}, format="json"
+            )
+        self.assertEqual(response.status_code, 400)
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            "/api/auth/introspect/", {"tokens": ["a"]}, format="json"
+        )
+        self.assertEqual(response.status_code, 403)
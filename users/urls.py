@@ -1,13 +1,26 @@
-from django.urls import path
-from rest_framework_simplejwt.views import (TokenObtainPairView,
-                                            TokenRefreshView)
+from django.urls import path, re_path
 
-from .views import MeAPI, PingAPI, SignupAPI
+from .views import (AvatarFileAPI, IntrospectAPI, MeAPI, MeAvatarAPI, PingAPI,
+                    RevokeTokenAPI, SignupAPI, TokenObtainPairAPI,
+                    TokenRefreshAPI, UserBatchAPI, UserChangesAPI)
 
 urlpatterns = [
     path("ping/", PingAPI.as_view()),
     path("signup/", SignupAPI.as_view()),
-    path("token/", TokenObtainPairView.as_view()),
-    path("token/refresh/", TokenRefreshView.as_view()),
+    path("token/", TokenObtainPairAPI.as_view()),
+    path("token/refresh/", TokenRefreshAPI.as_view()),
+    path("token/revoke/", RevokeTokenAPI.as_view()),
+    path("introspect/", IntrospectAPI.as_view()),
     path("me/", MeAPI.as_view()),
+    path("me/avatar/", MeAvatarAPI.as_view()),
+]
+
+user_urlpatterns = [
+    path("batch/", UserBatchAPI.as_view()),
+    path("changes/", UserChangesAPI.as_view()),
+    re_path(
+        r"^avatars/(?P<digest>[0-9a-f]{64})/(?P<name>original|(?:original|\d+)\.(?:png|jpg|gif|webp))$",
+        AvatarFileAPI.as_view(),
+        name="avatar-file",
+    ),
 ]
@@ -1,8 +1,27 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404
 from rest_framework import permissions, status
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.views import (TokenObtainPairView,
+                                            TokenRefreshView)
 
-from .serializers import SignupSerializer, UserSerializer
+from .avatars import (CONTENT_TYPES, AvatarUploadHandler, avatar_dir,
+                      find_original, schedule_thumbnails, store_avatar)
+from .changes import changes_since
+from .idempotency import IdempotentMixin
+from .introspection import introspect, revoke, verify
+from .jobs import enqueue_avatar_thumbnails, enqueue_signup_side_effects
+from .permissions import role_permission
+from .profiles import resolve_profiles
+from .serializers import (IntrospectSerializer, RevokeTokenSerializer,
+                          SignupSerializer, TokenObtainPairSerializer,
+                          TokenRefreshSerializer, UserBatchSerializer,
+                          UserChangeSerializer, UserChangesQuerySerializer,
+                          UserSerializer)
 
 
 class PingAPI(APIView):
@@ -12,21 +31,165 @@ class PingAPI(APIView):
         return Response({"status": "ok"}, status=200)
 
 
-class SignupAPI(APIView):
+class SignupAPI(IdempotentMixin, APIView):
     permission_classes = [permissions.AllowAny]
 
     def post(self, request):
         ser = SignupSerializer(data=request.data)
         if ser.is_valid():
             user = ser.save()
+            enqueue_signup_side_effects(user)
             return Response(
                 {"message": "signed_up", "username": user.username}, status=201
             )
         return Response(ser.errors, status=400)
 
 
+class TokenObtainPairAPI(IdempotentMixin, TokenObtainPairView):
+    serializer_class = TokenObtainPairSerializer
+    # Long enough for a retry storm; a replayed pair must not be near expiry.
+    idempotency_ttl = settings.IDEMPOTENCY_TOKEN_TTL
+
+
+class TokenRefreshAPI(TokenRefreshView):
+    serializer_class = TokenRefreshSerializer
+
+
+class RevokeTokenAPI(APIView):
+    """Revoke one access or refresh token until it expires, e.g. on logout."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        ser = RevokeTokenSerializer(data=request.data)
+        if not ser.is_valid():
+            return Response(ser.errors, status=400)
+        claims = verify(ser.validated_data["token"])
+        if claims is None:
+            return Response({"token": ["Token is invalid or expired."]}, status=400)
+        owner = str(claims.get(api_settings.USER_ID_CLAIM))
+        if owner != str(request.user.pk) and not request.user.is_staff:
+            return Response(
+                {"detail": "You can only revoke your own tokens."}, status=403
+            )
+        revoke(claims)
+        return Response(status=204)
+
+
+class IntrospectAPI(APIView):
+    """Verify many bearer tokens at once for the API gateway."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        ser = IntrospectSerializer(data=request.data)
+        if not ser.is_valid():
+            return Response(ser.errors, status=400)
+        return Response(
+            {"results": introspect(ser.validated_data["tokens"])}, status=200
+        )
+
+
 class MeAPI(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
         return Response(UserSerializer(request.user).data, status=200)
+
+
+class MeAvatarAPI(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def put(self, request):
+        handler = AvatarUploadHandler(request._request)
+        request._request.upload_handlers = [handler]
+        upload = request.FILES.get("file")
+        if handler.too_large:
+            return Response({"file": ["File is too large."]}, status=413)
+        if upload is None:
+            return Response({"file": ["No file was submitted."]}, status=400)
+        if upload.extension is None:
+            upload.close()
+            return Response({"file": ["Unsupported image type."]}, status=400)
+
+        digest = store_avatar(upload)
+        user = request.user
+        user.avatar_hash = digest
+        # ``avatar`` keeps any external URL; serializers derive the uploaded
+        # image's URL from the digest.
+        user.save(update_fields=["avatar_hash"])
+        schedule_thumbnails(digest)
+        return Response(UserSerializer(user).data, status=200)
+
+
+class AvatarFileAPI(APIView):
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, digest, name):
+        path = f"{avatar_dir(digest)}/{name}"
+        # Content-addressed files never change; the original only stands in
+        # for a thumbnail that is still being generated.
+        cache_control = "public, max-age=31536000, immutable"
+        if name == "original":
+            path = find_original(digest)
+            if path is None:
+                raise Http404
+        elif not default_storage.exists(path):
+            path = find_original(digest)
+            cache_control = "public, max-age=60"
+            if path is None:
+                raise Http404
+            # The in-process generation may have died with its worker.
+            enqueue_avatar_thumbnails(digest)
+        response = FileResponse(
+            default_storage.open(path),
+            content_type=CONTENT_TYPES[path.rsplit(".", 1)[1]],
+        )
+        response["Cache-Control"] = cache_control
+        return response
+
+
+class UserBatchAPI(APIView):
+    # For internal services: staff accounts or roles that may manage users.
+    permission_classes = [
+        permissions.IsAdminUser | role_permission("users.manage_users")
+    ]
+
+    def post(self, request):
+        ser = UserBatchSerializer(data=request.data)
+        if not ser.is_valid():
+            return Response(ser.errors, status=400)
+        profiles, missing = resolve_profiles(
+            ser.validated_data["ids"], ser.validated_data["usernames"]
+        )
+        return Response(
+            {
+                "results": {str(pk): data for pk, data in profiles.items()},
+                "missing": missing,
+            },
+            status=200,
+        )
+
+
+class UserChangesAPI(APIView):
+    permission_classes = [
+        permissions.IsAdminUser | role_permission("users.view_changes")
+    ]
+
+    def get(self, request):
+        params = UserChangesQuerySerializer(data=request.query_params)
+        if not params.is_valid():
+            return Response(params.errors, status=400)
+        changes, next_cursor, has_more = changes_since(
+            params.validated_data["since"], params.validated_data["limit"]
+        )
+        return Response(
+            {
+                "results": UserChangeSerializer(changes, many=True).data,
+                "next": next_cursor,
+                "has_more": has_more,
+            },
+            status=200,
+        )